@@ -1,6 +1,37 @@
+import os
 import sys
-import pennylane as qml
-from pennylane import numpy as np
+
+from qhack.devices import get_qnode
+
+if os.environ.get("QHACK_BACKEND") in ("numpy", "stabilizer"):
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    import pennylane as qml
+    from pennylane import numpy as np
+
+
+def circuit(oracle):
+    """Implements the Deutsch Jozsa algorithm."""
+
+    # QHACK #
+
+    # Insert any pre-oracle processing here
+    qml.Hadamard(0)
+    qml.Hadamard(1)
+    
+    qml.Hadamard(2)
+    qml.PauliZ(wires=2)
+    
+    oracle()  # DO NOT MODIFY this line
+
+    # Insert any post-oracle processing here
+    qml.Hadamard(0)
+    qml.Hadamard(1)
+    
+    # QHACK #
+
+    return qml.sample(wires=range(2))
 
 
 def deutsch_jozsa(oracle):
@@ -13,32 +44,7 @@ def deutsch_jozsa(oracle):
         - (str): "constant" or "balanced"
     """
 
-    dev = qml.device("default.qubit", wires=3, shots=1)
-
-    @qml.qnode(dev)
-    def circuit():
-        """Implements the Deutsch Jozsa algorithm."""
-
-        # QHACK #
-
-        # Insert any pre-oracle processing here
-        qml.Hadamard(0)
-        qml.Hadamard(1)
-        
-        qml.Hadamard(2)
-        qml.PauliZ(wires=2)
-        
-        oracle()  # DO NOT MODIFY this line
-
-        # Insert any post-oracle processing here
-        qml.Hadamard(0)
-        qml.Hadamard(1)
-        
-        # QHACK #
-
-        return qml.sample(wires=range(2))
-
-    sample = circuit()
+    sample = get_qnode(circuit, "default.qubit", wires=3, shots=1, backend=qml)(oracle)
 
     # QHACK #
 
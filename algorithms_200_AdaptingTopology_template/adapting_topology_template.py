@@ -4,6 +4,8 @@ import sys
 from pennylane import numpy as np
 import pennylane as qml
 
+from qhack.topology import CouplingMap
+
 graph = {
     0: [1],
     1: [0, 2, 3, 4],
@@ -16,6 +18,9 @@ graph = {
     8: [4],
 }
 
+# all-pairs shortest paths of `graph`, computed once
+coupling_map = CouplingMap(graph)
+
 
 def n_swaps(cnot):
     """Count the minimum number of swaps needed to create the equivalent CNOT.
@@ -29,41 +34,7 @@ def n_swaps(cnot):
     """
 
     # QHACK #
-    v = 9
-    src, dest = cnot.wires[0], cnot.wires[1]
-    visited = [False for i in range(v)]
-    pred=[-1 for i in range(v)]
-#     for i in range(v):
-#         pred[i] = -1
-        
-    visited[src] = True;
-    
-    queue = [src]
-    path_found = False
-    while (len(queue) != 0):
-        u = queue[0];
-        queue.pop(0);
-        for i in range(len(graph[u])):
-            if (visited[graph[u][i]] == False):
-                visited[graph[u][i]] = True;
-                pred[graph[u][i]] = u
-                queue.append(graph[u][i])
-  
-                # We stop BFS when we find
-                # destination.
-                if (graph[u][i] == dest):
-                    path_found = True
-                    break
-        if path_found == True:
-            break
-    path = []
-    crawl = dest
-    path.append(crawl)
-     
-    while (pred[crawl] != -1):
-        path.append(pred[crawl])
-        crawl = pred[crawl]
-    return (len(path)-2)*2
+    return coupling_map.n_swaps(cnot.wires[0], cnot.wires[1])
 
     # QHACK #
 
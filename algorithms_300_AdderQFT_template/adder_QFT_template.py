@@ -4,26 +4,93 @@ import sys
 from pennylane import numpy as np
 import pennylane as qml
 
+# parameter broadcasting (a batch of gate parameters in one execution) exists from PennyLane 0.24
+BROADCASTING = hasattr(qml.operation.Operator, "batch_size")
 
-def qfunc_adder(m, wires):
+
+def phase_diagonal(m, n_wires):
+    """Diagonal of the PhaseShift layer of `qfunc_adder`, as a single matrix.
+
+    PhaseShift(m pi / 2^i) on wire i multiplies the basis state |k> by exp(2 pi i m k / 2^n), so
+    the layer is the diagonal of those phases.
+
+    Args:
+        - m (int or np.ndarray): units to add, any shape
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): diagonals of shape m.shape + (2^n,)
+    """
+
+    size = 2 ** n_wires
+    k = np.arange(size)
+    # m k is only needed modulo 2^n, which keeps the phases exact for large m
+    roots = np.exp(2j * np.pi * k / size)
+    return roots[np.outer(np.ravel(m) % size, k) % size].reshape(np.shape(m) + k.shape)
+
+
+def qfunc_adder(m, wires, fused=False):
     """Quantum function capable of adding m units to a basic state given as input.
 
     Args:
-        - m (int): units to add.
+        - m (int): units to add; an array of addends broadcasts the circuit over them
         - wires (list(int)): list of wires in which the function will be executed on.
+        - fused (bool): apply the PhaseShift layer as one `qml.DiagonalQubitUnitary`
     """
 
     qml.QFT(wires=wires)
 
     # QHACK #
-    
-    for i in range(len(wires)):
-        const = m*np.pi/(2**i)
-        qml.PhaseShift(const ,wires=[i])
+
+    if fused:
+        qml.DiagonalQubitUnitary(phase_diagonal(m, len(wires)), wires=wires)
+    else:
+        for i in range(len(wires)):
+            const = m*np.pi/(2**i)
+            qml.PhaseShift(const ,wires=[i])
 
     # QHACK #
 
-    qml.QFT(wires=wires).inv()
+    qml.adjoint(qml.QFT)(wires=wires)
+
+
+def add_batch(ms, n_wires, basis_state, chunk=2 ** 22):
+    """Runs `qfunc_adder` for every addend in `ms` on the same input basis state.
+
+    With parameter broadcasting, a block of addends shares one execution of the circuit: every
+    PhaseShift gets one angle per addend. Blocks hold at most `chunk` amplitudes. The fused layer
+    is not used here: PennyLane broadcasts a `qml.DiagonalQubitUnitary` through dense matrices,
+    which is 4-10 times slower and runs out of memory on large blocks. Without broadcasting (PennyLane < 0.24) the addends run one by
+    one.
+
+    Args:
+        - ms (list(int)): units to add
+        - n_wires (int): number of wires
+        - basis_state (list(int)): input bits, wire 0 first
+        - chunk (int): amplitudes per block
+
+    Returns:
+        - (np.ndarray): output bits of shape (len(ms), n_wires), wire 0 first, as `qml.sample()`
+    """
+
+    wires = range(n_wires)
+    dev = qml.device("default.qubit", wires=n_wires)
+
+    @qml.qnode(dev)
+    def circuit(m):
+        qml.BasisState(np.array(basis_state), wires=wires)
+        qfunc_adder(m, wires)
+        return qml.probs(wires=wires)
+
+    ms = np.ravel(ms).astype(int)
+    step = max(chunk // 2 ** n_wires, 1) if BROADCASTING else 1
+    outcomes = np.empty(len(ms), dtype=int)
+    for start in range(0, len(ms), step):
+        block = ms[start : start + step]
+        probs = circuit(block) if BROADCASTING else circuit(int(block[0]))
+        outcomes[start : start + step] = np.argmax(np.reshape(probs, (len(block), -1)), axis=-1)
+    weights = 2 ** np.arange(n_wires - 1, -1, -1)
+    return (outcomes[:, None] // weights) % 2
 
 
 if __name__ == "__main__":
@@ -1,9 +1,19 @@
 #! /usr/bin/python3
 
+import os
 import sys
-import pennylane as qml
-from pennylane import numpy as np
-from pennylane.templates import QuantumPhaseEstimation
+
+from qhack.grover import GroverOperator, estimate_count, phase_estimation_probs, spectral_probs
+
+if os.environ.get("QHACK_BACKEND") == "numpy":
+    import numpy as np
+    from qhack import statevector as qml
+
+    QuantumPhaseEstimation = qml.QuantumPhaseEstimation
+else:
+    import pennylane as qml
+    from pennylane import numpy as np
+    from pennylane.templates import QuantumPhaseEstimation
 
 
 dev = qml.device("default.qubit", wires=8)
@@ -67,36 +77,82 @@ def circuit(indices):
 
     return qml.probs(estimation_wires)
 
-def number_of_solutions(indices):
+def implicit_probs(indices, n_wires=4, n_estimation=4):
+    """Same distribution as `circuit`, computed with the matrix-free `GroverOperator`.
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_wires (int): number of qubits of the search space
+        - n_estimation (int): number of estimation wires
+
+    Returns:
+        - (np.ndarray): Probabilities of measuring each computational basis state of the estimation wires
+    """
+
+    return phase_estimation_probs(GroverOperator(n_wires, indices), n_estimation)
+
+
+def check_spectral(samples=10, seed=0):
+    """Compares `spectral_probs` with `circuit` on random sets of marked elements.
+
+    Args:
+        - samples (int): number of random sets
+        - seed (int): seed of the sets
+
+    Returns:
+        - (float): largest absolute difference between the two distributions
+    """
+
+    rng = np.random.default_rng(seed)
+    error = 0.0
+    for _ in range(samples):
+        indices = [int(i) for i in rng.choice(16, rng.integers(1, 17), replace=False)]
+        error = max(error, float(np.max(np.abs(spectral_probs(len(indices), 4, 4) - circuit(indices)))))
+    return error
+
+
+def number_of_solutions(indices, mode="circuit", n_wires=4, n_estimation=4):
     """Implement the formula given in the problem statement to find the number of solutions from the output of your circuit
     Args:
         - indices (list(int)): A list of bits representing the elements that map to 1.
+        - mode (str): "circuit" runs `circuit`, "implicit" uses `implicit_probs` and "spectral"
+          `qhack.grover.spectral_probs`
+        - n_wires (int): number of qubits of the search space (not in "circuit" mode)
+        - n_estimation (int): number of estimation wires (not in "circuit" mode)
     Returns:
         - (float): number of elements as estimated by the quantum counting algorithm
     """
 
     # QHACK #
+    if mode == "spectral":
+        return estimate_count(spectral_probs(len(set(indices)), n_wires, n_estimation), n_wires)
+    if mode == "implicit":
+        return estimate_count(implicit_probs(indices, n_wires, n_estimation), n_wires)
+    if (n_wires, n_estimation) != (4, 4):
+        raise ValueError("the circuit has 4 search and 4 estimation wires")
     probs = circuit(indices)
     index = None
     for i in range(len(probs)):
-        if probs[i] == max(probs):
+        # the peaks at +theta and -theta are equal up to rounding; take the first one
+        if np.isclose(probs[i], max(probs)):
             index = i
             break
     theta = (np.pi*index)/8
     return float(16*np.sin(theta/2)*np.sin(theta/2))
     # QHACK #
 
-def relative_error(indices):
+def relative_error(indices, **options):
     """Calculate the relative error of the quantum counting estimation
     Args:
         - indices (list(int)): A list of bits representing the elements that map to 1.
+        - options: `mode`, `n_wires` and `n_estimation` of `number_of_solutions`
     Returns: 
         - (float): relative error
     """
 
     # QHACK #
 
-    M = number_of_solutions(indices)
+    M = number_of_solutions(indices, **options)
     N = len(indices)
     rel_err = float(((M-N)/N)*100)
 
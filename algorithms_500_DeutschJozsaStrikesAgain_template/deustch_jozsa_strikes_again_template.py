@@ -1,8 +1,39 @@
 #! /usr/bin/python3
 
+import os
 import sys
-from pennylane import numpy as np
-import pennylane as qml
+
+from qhack.devices import get_qnode
+
+if os.environ.get("QHACK_BACKEND") in ("numpy", "stabilizer"):
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    import pennylane as qml
+    from pennylane import numpy as np
+
+
+def circuit(f):
+    """Implements the Deutsch Jozsa algorithm."""
+
+    # QHACK #
+
+    # Insert any pre-oracle processing here
+    qml.Hadamard(0)
+    qml.Hadamard(1)
+    
+    qml.Hadamard(2)
+    qml.PauliZ(wires=2)
+    
+    f(wires=[0,1,2])  # DO NOT MODIFY this line
+
+    # Insert any post-oracle processing here
+    qml.Hadamard(0)
+    qml.Hadamard(1)
+    
+    # QHACK #
+
+    return qml.sample(wires=range(2))
 
 
 def deutsch_jozsa(fs):
@@ -17,33 +48,10 @@ def deutsch_jozsa(fs):
     """
 
     # QHACK #
-    dev = qml.device("default.qubit", wires=3, shots=1)
-    @qml.qnode(dev)
-    def circuit(f):
-        """Implements the Deutsch Jozsa algorithm."""
-
-        # QHACK #
-
-        # Insert any pre-oracle processing here
-        qml.Hadamard(0)
-        qml.Hadamard(1)
-        
-        qml.Hadamard(2)
-        qml.PauliZ(wires=2)
-        
-        f(wires=[0,1,2])  # DO NOT MODIFY this line
-
-        # Insert any post-oracle processing here
-        qml.Hadamard(0)
-        qml.Hadamard(1)
-        
-        # QHACK #
-
-        return qml.sample(wires=range(2))
-    
+    qnode = get_qnode(circuit, "default.qubit", wires=3, shots=1, backend=qml)
     balanced,constant = 0,0
     for f in fs:
-        sample = circuit(f)
+        sample = qnode(f)
         if sample[0] == 0 and sample[1] == 0:
             constant = constant + 1
         else:
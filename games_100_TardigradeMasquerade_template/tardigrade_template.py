@@ -2,6 +2,8 @@ import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack.devices import get_qnode
+
 
 def second_renyi_entropy(rho):
     """Computes the second Renyi entropy of a given density matrix."""
@@ -10,6 +12,38 @@ def second_renyi_entropy(rho):
     return -np.real(np.log(np.sum(rho_diag_2)))
 
 
+def get_mu_b():
+    """Quantum function preparing the state of qubits A and B with no tardigrade present.
+
+    Returns:
+        - (MeasurementProcess): the density matrix of wires 0 (A) and 1 (B)
+    """
+    qml.Hadamard(0)
+    qml.CNOT(wires=[0,1])
+    qml.X(1)
+    return qml.density_matrix([0,1])
+
+
+def get_rho_b(theta):
+    """Quantum function preparing psi_ABT, with the tardigrade T on wire 2, and undoing the
+    entanglement between A and B.
+
+    Args:
+        - theta (float): the angle that defines the state psi_ABT
+
+    Returns:
+        - (MeasurementProcess): the reduced density matrix of wire 1 (B)
+    """
+    qml.Hadamard(0)
+    qml.X(0)
+    qml.CRY(theta, wires=[0,1])
+    qml.X(0)
+    qml.CNOT(wires=[1,2])
+    qml.X(1)
+    qml.CNOT(wires=[0,1])
+    return qml.density_matrix([1])
+
+
 def compute_entanglement(theta):
     """Computes the second Renyi entropy of circuits with and without a tardigrade present.
 
@@ -23,29 +57,12 @@ def compute_entanglement(theta):
         was initially present
     """
 
-    dev = qml.device("default.qubit", wires=3)
-
     # QHACK #
-    @qml.qnode(dev)
-    def get_mu_b():
-        qml.Hadamard(0)
-        qml.CNOT(wires=[0,1])
-        qml.X(1)
-        return qml.density_matrix([0,1])
-    @qml.qnode(dev)
-    def get_rho_b():
-        qml.Hadamard(0)
-        qml.X(0)
-        qml.CRY(theta, wires=[0,1])
-        qml.X(0)
-        qml.CNOT(wires=[1,2])
-        qml.X(1)
-        qml.CNOT(wires=[0,1])
-        return qml.density_matrix([1])
-    
-    
-    S2_without_tardigrade = second_renyi_entropy(get_mu_b()) 
-    S2_with_tardigrade = second_renyi_entropy(get_rho_b())
+    mu_b = get_qnode(get_mu_b, "default.qubit", wires=3)
+    rho_b = get_qnode(get_rho_b, "default.qubit", wires=3)
+
+    S2_without_tardigrade = second_renyi_entropy(mu_b())
+    S2_with_tardigrade = second_renyi_entropy(rho_b(theta))
     return S2_without_tardigrade, S2_with_tardigrade
     # QHACK #
 
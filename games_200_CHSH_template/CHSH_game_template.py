@@ -1,28 +1,54 @@
 #! /usr/bin/python3
 
 import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
 import pennylane as qml
 from pennylane import numpy as np
 
 
 dev = qml.device("default.qubit", wires=2)
 
+# referee questions (x, y) in the order of the rows returned by `chsh_batched`
+QUESTIONS = [(0, 0), (0, 1), (1, 0), (1, 1)]
+QUESTIONS_X = np.array([x for x, _ in QUESTIONS], requires_grad=False)
+QUESTIONS_Y = np.array([y for _, y in QUESTIONS], requires_grad=False)
+
+# Adam schedule shared by `optimize`, `optimize_params` and `closed_form_optimize`: EPOCHS epochs of
+# two steps from INIT_PARAMS, the angles clipped to [-2 pi, 2 pi] after the second step. With equal
+# angles the gradient of theta_A1 and theta_B1 is exactly zero; from there the optimizer ends at
+# 0.85218 instead of 0.85355 for alpha = beta, so the start is slightly off them.
+INIT_PARAMS = [0.01, 0.02, 0.03, 0.04]
+STEPSIZE = 0.8
+EPOCHS = 100
+
+# parameter broadcasting (a batch of gate parameters in one execution) exists from PennyLane 0.24
+BROADCASTING = hasattr(qml.operation.Operator, "batch_size")
+
+# WIN_MASK[k, i] is 1 when basis state i of Alice's and Bob's qubits wins for question QUESTIONS[k]:
+# equal answers unless x = y = 1
+WIN_MASK = np.array([[1, 0, 0, 1], [1, 0, 0, 1], [1, 0, 0, 1], [0, 1, 1, 0]], requires_grad=False)
 
-def prepare_entangled(alpha, beta):
+# SIGNS[x, y] is +1 when Alice and Bob win with equal answers and -1 when they need different ones
+SIGNS = np.array([[1, 1], [1, -1]], requires_grad=False)
+
+
+def prepare_entangled(alpha, beta, wires=(0, 1)):
     """Construct a circuit that prepares the (not necessarily maximally) entangled state in terms of alpha and beta
     Do not forget to normalize.
 
     Args:
         - alpha (float): real coefficient of |00>
         - beta (float): real coefficient of |11>
+        - wires (tuple): Alice's and Bob's wire
     """
 
     # QHACK #
     norm = np.sqrt(alpha**2 + beta**2)
     alpha, beta = alpha/norm, beta/norm
     angle = 2*np.arcsin(beta)
-    qml.RY(angle,wires=0)
-    qml.CNOT(wires=[0,1])
+    qml.RY(angle,wires=wires[0])
+    qml.CNOT(wires=list(wires))
     # QHACK #
 
 @qml.qnode(dev)
@@ -61,10 +87,14 @@ def chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, x, y, alpha, beta):
     # QHACK #
 
     return qml.probs(wires=[0, 1])
-    
 
-def winning_prob(params, alpha, beta):
-    """Define a function that returns the probability of Alice and Bob winning the game.
+
+@qml.qnode(dev, diff_method="backprop")
+def chsh_batched(params, alpha, beta):
+    """All four rounds of the CHSH game in one broadcast execution.
+
+    Alice's and Bob's rotations get one angle per question pair, so the device runs the 2-qubit
+    circuit for the four (x, y) at once. Needs PennyLane with parameter broadcasting.
 
     Args:
         - params (list(float)): List containing [theta_A0,theta_A1,theta_B0,theta_B1]
@@ -72,77 +102,319 @@ def winning_prob(params, alpha, beta):
         - beta (float): real coefficient of |11>
 
     Returns:
-        - (float): Probability of winning the game
+        - (np.tensor): 4x4 array, row k holds the probabilities of each basis state for QUESTIONS[k]
     """
 
-    # QHACK #
+    prepare_entangled(alpha, beta)
+    qml.RY(2*params[QUESTIONS_X], wires=0)
+    qml.RY(2*params[2 + QUESTIONS_Y], wires=1)
+
+    return qml.probs(wires=[0, 1])
+
+
+def batched_win(params, alpha, beta):
+    """Probability of winning, averaged over the four questions, from a single `chsh_batched` run.
+
+    Without parameter broadcasting it is `circuit_win`, one `chsh_circuit` run per question.
+    """
+
+    if not BROADCASTING:
+        return circuit_win(params, alpha, beta)
+    return np.sum(chsh_batched(np.asarray(params), alpha, beta) * WIN_MASK) / 4
+
+
+def circuit_win(params, alpha, beta):
+    """Probability of winning, averaged over the four questions, with one `chsh_circuit` run each."""
+
+    rows = [chsh_circuit(*params, x, y, alpha, beta) for x, y in QUESTIONS]
+    return np.sum(qml.math.stack(rows) * WIN_MASK) / 4
+
+
+def _closed_form_terms(params, alpha, beta):
+    """Cosines and sines of the doubled angles and sin(2 phi) of the prepared state.
+
+    The entangled state is cos(phi)|00> + sin(phi)|11>, and measuring it after RY(2 theta_A) and
+    RY(2 theta_B) gives the correlation <Z Z> = cos(2 theta_A) cos(2 theta_B)
+    + sin(2 phi) sin(2 theta_A) sin(2 theta_B). The functions below broadcast over leading axes of
+    `params` (shape (..., 4)), `alpha` and `beta`.
+    """
+
+    if isinstance(params, (list, tuple)):
+        params = np.array(params)
+    c, s = np.cos(2 * params), np.sin(2 * params)
+    b = beta / np.sqrt(alpha**2 + beta**2)
+    k = 2 * b * np.sqrt(1 - b**2)
+    k = np.reshape(k, np.shape(k) + (1, 1))
+    return c[..., :2, None], s[..., :2, None], c[..., None, 2:], s[..., None, 2:], k
+
+
+def closed_form_win(params, alpha, beta):
+    """Probability of winning computed from the correlations in closed form, without a circuit.
 
-    theta_A0, theta_A1, theta_B0, theta_B1 = params[0], params[1], params[2], params[3]
+    Args:
+        - params (np.tensor): [theta_A0,theta_A1,theta_B0,theta_B1], or an array of shape (..., 4)
+        - alpha (float or np.ndarray): real coefficient of |00>
+        - beta (float or np.ndarray): real coefficient of |11>
+
+    Returns:
+        - (float or np.ndarray): Probability of winning the game
+    """
+
+    cA, sA, cB, sB, k = _closed_form_terms(params, alpha, beta)
+    correlations = cA * cB + k * sA * sB
+    return 0.5 + np.sum(SIGNS * correlations, axis=(-2, -1)) / 8
+
+
+def closed_form_grad(params, alpha, beta):
+    """Analytic gradient of `closed_form_win` with respect to the four angles.
+
+    Args:
+        - params (np.tensor): [theta_A0,theta_A1,theta_B0,theta_B1], or an array of shape (..., 4)
+        - alpha (float or np.ndarray): real coefficient of |00>
+        - beta (float or np.ndarray): real coefficient of |11>
+
+    Returns:
+        - (np.ndarray): gradient, same shape as `params`
+    """
+
+    cA, sA, cB, sB, k = _closed_form_terms(params, alpha, beta)
+    grad_A = np.sum(SIGNS * (k * cA * sB - sA * cB), axis=-1) / 4
+    grad_B = np.sum(SIGNS * (k * sA * cB - cA * sB), axis=-2) / 4
+    return np.concatenate([grad_A, grad_B], axis=-1)
+
+
+def closed_form_optimize(alphas, betas, epochs=EPOCHS, stepsize=STEPSIZE):
+    """Runs the Adam optimization of `optimize` on the closed form, for many states at once.
 
-    a = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 0, 0, alpha, beta))
-    win1 = a[0] + a[3]
+    The update is the one of `qml.AdamOptimizer` (beta1=0.9, beta2=0.99, eps=1e-8), vectorized
+    over the states, so thousands of optimizations take a fraction of a second.
 
-    b = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 0, 1, alpha, beta))
-    win2 = b[0] + b[3]
+    Args:
+        - alphas (np.ndarray): real coefficients of |00>
+        - betas (np.ndarray): real coefficients of |11>, same shape as `alphas`
+        - epochs (int): number of epochs of two Adam steps
+        - stepsize (float): Adam step size
+
+    Returns:
+        - (np.ndarray, np.ndarray): optimized angles of shape (..., 4) and winning probabilities
+    """
 
-    c = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 1, 0, alpha, beta))
-    win3 = c[0] + c[3]
+    alphas, betas = np.array(alphas, dtype=float), np.array(betas, dtype=float)
+    params = np.broadcast_to(np.array(INIT_PARAMS), alphas.shape + (4,)).copy()
+    first, second = np.zeros_like(params), np.zeros_like(params)
+    for t in range(1, 2 * epochs + 1):
+        grad = -closed_form_grad(params, alphas, betas)
+        first = 0.9 * first + 0.1 * grad
+        second = 0.99 * second + 0.01 * grad**2
+        rate = stepsize * np.sqrt(1 - 0.99**t) / (1 - 0.9**t)
+        params = params - rate * first / (np.sqrt(second) + 1e-8)
+        if t % 2 == 0:
+            params = np.clip(params, -2 * np.pi, 2 * np.pi)
+    return params, closed_form_win(params, alphas, betas)
+
+
+def check_closed_form(samples=20, seed=0):
+    """Compares the closed form with the `chsh_batched` circuit at random points.
+
+    Args:
+        - samples (int): number of random (params, alpha, beta) points
+        - seed (int): seed of the points
 
-    d = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 1, 1, alpha, beta))
-    win4 = d[1] + d[2]
+    Returns:
+        - (float, float): largest absolute difference of the winning probabilities and of the gradients
+    """
+
+    rng = np.random.default_rng(seed)
+    win_error = grad_error = 0.0
+    for _ in range(samples):
+        params = np.array(rng.uniform(-np.pi, np.pi, 4), requires_grad=True)
+        alpha, beta = rng.uniform(-1, 1, 2)
+        circuit_grad = qml.grad(lambda p: batched_win(p, alpha, beta))(params)
+        win_error = max(win_error, abs(float(batched_win(params, alpha, beta) - closed_form_win(params, alpha, beta))))
+        grad_error = max(grad_error, float(np.max(np.abs(circuit_grad - closed_form_grad(params, alpha, beta)))))
+    return win_error, grad_error
+
+
+def check_closed_form_optimize(samples=5, seed=0):
+    """Compares `closed_form_optimize` with `optimize(..., backend="closed-form")` on random states.
+
+    Args:
+        - samples (int): number of random (alpha, beta) states
+        - seed (int): seed of the states
+
+    Returns:
+        - (float): largest absolute difference of the optimized winning probabilities
+    """
+
+    rng = np.random.default_rng(seed)
+    alphas, betas = rng.uniform(-1, 1, (2, samples))
+    _, wins = closed_form_optimize(alphas, betas)
+    return max(abs(float(np.round(w, 5)) - optimize(a, b, "closed-form")) for a, b, w in zip(alphas, betas, wins))
+
+
+# backend name -> (winning probability, its gradient or None to differentiate with autograd)
+BACKENDS = {
+    "circuit": (batched_win, None),
+    "closed-form": (closed_form_win, closed_form_grad),
+}
+
+
+def adam_schedule(cost, grad_fn=None):
+    """Runs the Adam schedule (INIT_PARAMS, STEPSIZE, EPOCHS) of `optimize`.
+
+    Args:
+        - cost (callable): cost function of the four angles
+        - grad_fn (callable): its gradient, None to differentiate with autograd
+
+    Returns:
+        - (np.tensor): the optimized angles
+    """
+
+    params = np.array(INIT_PARAMS, requires_grad=True)
+    opt = qml.AdamOptimizer(stepsize=STEPSIZE)
+    for epoch in range(EPOCHS):
+        params = opt.step(cost, params, grad_fn=grad_fn)
+        params = np.clip(opt.step(cost, params, grad_fn=grad_fn), -2 * np.pi, 2 * np.pi)
+    return params
+
+
+def _cost_and_grad(alpha, beta, backend):
+    """Cost function 1 - winning probability and its gradient function (None for autograd)."""
+
+    win, grad = BACKENDS[backend]
+
+    def cost(params):
+        return 1 - win(params, alpha, beta)
+
+    if grad is None:
+        return cost, None
+    return cost, lambda params: -grad(params, alpha, beta)
+
+
+def winning_prob(params, alpha, beta, backend="circuit"):
+    """Define a function that returns the probability of Alice and Bob winning the game.
+
+    Args:
+        - params (list(float)): List containing [theta_A0,theta_A1,theta_B0,theta_B1]
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+        - backend (str): "circuit" (one `chsh_circuit` run per question) or "closed-form"
+
+    Returns:
+        - (float): Probability of winning the game
+    """
 
-    return np.round((win1+win2+win3+win4)/4 ,5)
+    # QHACK #
+    win = circuit_win if backend == "circuit" else BACKENDS[backend][0]
+    return np.round(win(params, alpha, beta), 5)
     # QHACK #
     
 
-def optimize(alpha, beta):
+def optimize(alpha, beta, backend="circuit"):
     """Define a function that optimizes theta_A0, theta_A1, theta_B0, theta_B1 to maximize the probability of winning the game
 
     Args:
         - alpha (float): real coefficient of |00>
         - beta (float): real coefficient of |11>
+        - backend (str): "circuit" (the `chsh_batched` QNode) or "closed-form"
 
     Returns:
         - (float): Probability of winning
     """
 
-    def cost(params):
-        """Define a cost function that only depends on params, given alpha and beta fixed"""
-
     # QHACK #
-        theta_A0, theta_A1, theta_B0, theta_B1 = params[0], params[1], params[2], params[3]
-
-        a = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 0, 0, alpha, beta))
-        win1 = a[0] + a[3]
-        
-        b = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 0, 1, alpha, beta))
-        win2 = b[0] + b[3]
-        
-        c = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 1, 0, alpha, beta))
-        win3 = c[0] + c[3]
-        
-        d = (chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, 1, 1, alpha, beta))
-        win4 = d[1] + d[2]
-        
-        return 1 - ((win1+win2+win3+win4)/4)
-        
-    #Initialize parameters, choose an optimization method and number of steps
-    init_params = np.array([0.01, 0.01, 0.01, 0.01],requires_grad=True)
-    opt = qml.AdamOptimizer(stepsize=0.8)
-    steps = 100
+    # cost function 1 - winning probability, depending only on params for alpha and beta fixed
+    cost, grad_fn = _cost_and_grad(alpha, beta, backend)
 
     # QHACK #
-    
-    # set the initial parameter values
-    params = init_params
 
-    for epoch in range(steps):
-        params = opt.step(cost, params)
-        params = np.clip(opt.step(cost, params), -2 * np.pi, 2 * np.pi)
-        
+    # Adam from INIT_PARAMS, EPOCHS epochs of two steps
+    params = adam_schedule(cost, grad_fn)
+
     # QHACK #
 
-    return winning_prob(params, alpha, beta)
+    return winning_prob(params, alpha, beta, backend)
+
+
+def optimize_params(alpha, beta, init_params=None, gtol=1e-6, max_steps=500, backend="circuit"):
+    """Maximizes the winning probability until the gradient vanishes.
+
+    A cold start runs the Adam schedule of `optimize` (`adam_schedule`) first. The angles are then refined by
+    gradient descent, which, unlike Adam, settles on the optimum instead of circling it, so a
+    start close to the optimum (e.g. the result for a neighbouring state) converges in a few
+    steps.
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+        - init_params (list(float)): starting angles; None for a cold start
+        - gtol (float): stop once the norm of the gradient is below this
+        - max_steps (int): maximum number of gradient-descent steps
+        - backend (str): "circuit" (the `chsh_batched` QNode) or "closed-form"
+
+    Returns:
+        - (dict): with keys "params" (list of the four angles), "win" (winning probability) and
+        "steps" (number of optimizer steps)
+    """
+
+    cost, grad_fn = _cost_and_grad(alpha, beta, backend)
+
+    steps = 0
+    if init_params is None:
+        params = adam_schedule(cost, grad_fn)
+        steps = 2 * EPOCHS
+    else:
+        params = np.array(init_params, requires_grad=True)
+
+    opt = qml.GradientDescentOptimizer(stepsize=1.0)
+    for _ in range(max_steps):
+        grad = opt.compute_grad(cost, (params,), {}, grad_fn=grad_fn)[0]
+        if np.linalg.norm(grad[0]) < gtol:
+            break
+        params = opt.apply_grad(grad, (params,))[0]
+        steps += 1
+
+    return {"params": [float(p) for p in params], "win": float(1 - cost(params)), "steps": steps}
+
+
+def sweep(alphas, betas, max_workers=None, gtol=1e-6, max_steps=500, backend="circuit"):
+    """Optimal winning probability over the grid alphas x betas, computed on a process pool.
+
+    Only the first grid point starts cold. Every other point is submitted as soon as its left or
+    upper neighbour has converged and starts from that neighbour's angles, so the grid is filled
+    in diagonal wavefronts.
+
+    Args:
+        - alphas (list(float)): real coefficients of |00>
+        - betas (list(float)): real coefficients of |11>
+        - max_workers (int): size of the process pool (defaults to the number of CPUs)
+        - gtol (float): convergence threshold on the gradient norm, see `optimize_params`
+        - max_steps (int): maximum number of gradient-descent steps per point
+        - backend (str): "circuit" (the `chsh_batched` QNode) or "closed-form"
+
+    Yields:
+        - (dict): the result of `optimize_params` plus the keys "alpha" and "beta", in order of
+        completion
+    """
+
+    alphas, betas = list(alphas), list(betas)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(optimize_params, alphas[0], betas[0], None, gtol, max_steps, backend): (0, 0)}
+        submitted = {(0, 0)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, j = pending.pop(future)
+                result = future.result()
+                yield dict(result, alpha=alphas[i], beta=betas[j])
+
+                for ni, nj in ((i + 1, j), (i, j + 1)):
+                    if ni < len(alphas) and nj < len(betas) and (ni, nj) not in submitted:
+                        submitted.add((ni, nj))
+                        future = pool.submit(
+                            optimize_params, alphas[ni], betas[nj], result["params"], gtol, max_steps, backend
+                        )
+                        pending[future] = (ni, nj)
 
 
 if __name__ == '__main__':
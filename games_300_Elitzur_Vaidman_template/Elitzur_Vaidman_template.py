@@ -1,8 +1,16 @@
 #! /usr/bin/python3
 
+import os
 import sys
-import pennylane as qml
-from pennylane import numpy as np
+
+from qhack.stats import INTERVALS
+
+if os.environ.get("QHACK_BACKEND") == "numpy":
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    import pennylane as qml
+    from pennylane import numpy as np
 
 dev = qml.device("default.qubit", wires=1, shots=1)
 
@@ -45,12 +53,140 @@ def bomb_tester(angle):
     return qml.sample(qml.PauliZ(0))
 
 
-def simulate(angle, n):
+dev_exact = qml.device("default.qubit", wires=1)
+
+
+@qml.qnode(dev_exact)
+def beam_splitter_probs(angle):
+    """Exact outcome probabilities of the one-shot measurement made by `is_bomb` and `bomb_tester`.
+
+    Args:
+        - angle (float): transmissivity of the beam splitter
+
+    Returns:
+        - (np.tensor): probabilities of measuring PauliZ = +1 (the photon hits the bomb) and
+        PauliZ = -1 (the photon takes the other path)
+    """
+
+    qml.RY(2*angle, wires=0)
+    return qml.probs(wires=0)
+
+
+def simulate_batched(angle, n, trials=10000, seed=None):
+    """Vectorized version of the loop in `simulate`.
+
+    The outcome probabilities are computed once and all trials x n bomb measurements, plus the
+    final measurement of every surviving bomb, are drawn as NumPy arrays.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - trials (int): number of bombs tested
+        - seed (int): seed of the random number generator
+
+    Returns:
+        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+    """
+
+    p_bomb, p_dbeep = (float(p) for p in beam_splitter_probs(angle))
+    rng = np.random.default_rng(seed)
+
+    not_explode, dbeeps = sample_bombs(p_bomb, p_dbeep, n, trials, rng)
+    return dbeeps/not_explode
+
+
+def sample_bombs(p_bomb, p_dbeep, n, trials, rng):
+    """Draws the outcomes of `trials` bomb tests at once.
+
+    Args:
+        - p_bomb (float): probability that the photon hits the bomb in one bomb circuit
+        - p_dbeep (float): probability that the final detector beeps D
+        - n (int): number of bomb circuits concatenated
+        - trials (int): number of bombs tested
+        - rng (np.random.Generator): random number generator
+
+    Returns:
+        - (int, int): number of bombs that didn't explode and number of bombs successfully tested
+    """
+
+    exploded = np.any(rng.random((trials, n)) < p_bomb, axis=1)
+    not_explode = trials - int(np.count_nonzero(exploded))
+    dbeeps = int(np.count_nonzero(rng.random(not_explode) < p_dbeep))
+    return not_explode, dbeeps
+
+
+def analytic_ratio(angle):
+    """Exact value of the ratio estimated by `simulate`.
+
+    Every bomb circuit is independent of the final measurement, so the fraction of surviving
+    bombs that are successfully tested is the probability of the final D beep, for any n.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+
+    Returns:
+        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+    """
+
+    return float(beam_splitter_probs(angle)[1])
+
+
+def stream_ratio(angle, n, precision=0.005, confidence=0.95, interval="wilson", batch=1000, max_trials=10**7, seed=None):
+    """Estimates the ratio of `simulate` batch by batch until the confidence interval is narrow enough.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - precision (float): stop once the half-width of the interval is at most this
+        - confidence (float): confidence level of the interval
+        - interval (str): "wilson" or "clopper-pearson"
+        - batch (int): number of bombs tested per step
+        - max_trials (int): stop after this many bombs even if the precision is not reached
+        - seed (int): seed of the random number generator
+
+    Yields:
+        - (dict): running totals after every batch, with keys "trials", "not_explode", "dbeeps",
+        "ratio", "low", "high" and "converged"
+    """
+
+    bounds = INTERVALS[interval]
+    p_bomb, p_dbeep = (float(p) for p in beam_splitter_probs(angle))
+    rng = np.random.default_rng(seed)
+
+    trials = not_explode = dbeeps = 0
+    while trials < max_trials:
+        size = min(batch, max_trials - trials)
+        survived, beeped = sample_bombs(p_bomb, p_dbeep, n, size, rng)
+        trials, not_explode, dbeeps = trials + size, not_explode + survived, dbeeps + beeped
+
+        low, high = bounds(dbeeps, not_explode, confidence)
+        converged = (high - low) / 2 <= precision
+        yield {
+            "trials": trials,
+            "not_explode": not_explode,
+            "dbeeps": dbeeps,
+            "ratio": dbeeps/not_explode if not_explode else float("nan"),
+            "low": low,
+            "high": high,
+            "converged": converged,
+        }
+        if converged:
+            return
+
+
+def simulate(angle, n, mode="batched", trials=10000, seed=None, precision=0.005):
     """Concatenate n bomb circuits and a final measurement, and return the results of 10000 one-shot measurements
 
     Args:
         - angle (float): transmissivity of all the beam splitters, taken to be identical.
         - n (int): number of bomb circuits concatenated
+        - mode (str): "batched" samples all outcomes at once (see `simulate_batched`), "circuit"
+        executes the one-shot circuits trial by trial, "sequential" samples until the half-width of
+        the 95% Wilson interval is at most `precision` (see `stream_ratio`) and "analytic" returns the
+        exact ratio (see `analytic_ratio`)
+        - trials (int): number of bombs tested
+        - seed (int): seed of the batched sampler
+        - precision (float): target half-width of the "sequential" mode
 
     Returns:
         - (float): number of bombs successfully tested / number of bombs that didn't explode.
@@ -58,9 +194,21 @@ def simulate(angle, n):
 
     # QHACK #
 
+    if mode == "batched":
+        return simulate_batched(angle, n, trials, seed)
+    if mode == "analytic":
+        return analytic_ratio(angle)
+    if mode == "sequential":
+        estimate = {"ratio": float("nan")}
+        for estimate in stream_ratio(angle, n, precision=precision, seed=seed):
+            pass
+        return estimate["ratio"]
+    if mode != "circuit":
+        raise ValueError(f"unknown mode {mode!r}")
+
     dbeeps = 0
     not_explode = 0
-    for j in range(10000):
+    for j in range(trials):
         bomb = False
         for i in range(n):
             if is_bomb(angle) == 1:
@@ -1,8 +1,14 @@
 #! /usr/bin/python3
 
+import os
 import sys
-from pennylane import numpy as np
-import pennylane as qml
+
+if os.environ.get("QHACK_BACKEND") in ("numpy", "stabilizer"):
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    from pennylane import numpy as np
+    import pennylane as qml
 
 
 dev = qml.device("default.qubit", wires=[0, 1, "sol"], shots=1)
@@ -4,6 +4,20 @@ import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack.devices import get_qnode
+
+
+def circuit1(theta1, theta2):
+    qml.RX(theta1, wires=0)
+    qml.RY(theta2, wires=0)
+    return qml.expval(qml.PauliX(0))
+
+
+def circuit2(theta1, theta2):
+    qml.RY(theta2, wires=0)
+    qml.RX(theta1, wires=0)
+    return qml.expval(qml.PauliX(0))
+
 
 def compare_circuits(angles):
     """Given two angles, compare two circuit outputs that have their order of operations flipped: RX then RY VERSUS RY then RX.
@@ -16,22 +30,12 @@ def compare_circuits(angles):
     """
 
     # QHACK #
-    dev = qml.device("default.qubit", wires=1)
     theta1, theta2 = angles[0], angles[1]
-    # define a device and quantum functions/circuits here
-    @qml.qnode(dev)
-    def circuit1(theta1, theta2):
-        qml.RX(theta1, wires=0)
-        qml.RY(theta2, wires=0)
-        return qml.expval(qml.PauliX(0))
-    
-    @qml.qnode(dev)
-    def circuit2(theta1, theta2):
-        qml.RY(theta2, wires=0)
-        qml.RX(theta1, wires=0)
-        return qml.expval(qml.PauliX(0))
-    
-    return abs(circuit1(theta1, theta2) - circuit2(theta1, theta2))
+    # cached QNodes of the module-level circuits, shared by every call
+    qnode1 = get_qnode(circuit1, "default.qubit", wires=1)
+    qnode2 = get_qnode(circuit2, "default.qubit", wires=1)
+
+    return abs(qnode1(theta1, theta2) - qnode2(theta1, theta2))
     # QHACK #
 
 
@@ -4,6 +4,8 @@ import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack.devices import get_qnode
+
 
 def matrix_norm(mixed_state, pure_state):
     """Computes the matrix one-norm of the difference between mixed and pure states.
@@ -19,6 +21,20 @@ def matrix_norm(mixed_state, pure_state):
     return np.sum(np.abs(mixed_state - np.outer(pure_state, np.conj(pure_state))))
 
 
+def pure_state_circuit(angles):
+    """Applies one y-rotation per wire and returns the state vector."""
+    for i,p in enumerate(angles):
+        qml.RY(p,wires=i)
+    return qml.state()
+
+
+def mixed_state_circuit(angles):
+    """Applies one y-rotation per wire and returns the density matrix of all wires."""
+    for i,p in enumerate(angles):
+        qml.RY(p,wires=i)
+    return qml.density_matrix(wires=range(0,len(angles)))
+
+
 def compare_circuits(num_wires, params):
     """Function that returns the matrix norm between the mixed- and pure-state versions of the same state.
 
@@ -32,10 +48,10 @@ def compare_circuits(num_wires, params):
     """
 
     # QHACK #
-    # define devices
-    dev = qml.device("default.qubit", wires=num_wires)
-    # add a decorator here
-    @qml.qnode(dev)
+    # cached device and QNodes, shared by every call with the same number of wires
+    pure_qnode = get_qnode(pure_state_circuit, "default.qubit", wires=num_wires)
+    mixed_qnode = get_qnode(mixed_state_circuit, "default.qubit", wires=num_wires)
+
     def pure_circuit():
         """A circuit that contains `num_wires` y-rotation gates.
         The argument params[0] are the parameters you should use here to define the y-rotations.
@@ -43,13 +59,8 @@ def compare_circuits(num_wires, params):
         Returns:
             - (np.tensor): A state vector
         """
-        # create the circuit here
-        for i,p in enumerate(params[0]):
-            qml.RY(p,wires=i)
-        return qml.state()
+        return pure_qnode(params[0])
 
-    # add a decorator here
-    @qml.qnode(dev)
     def mixed_circuit():
         """A circuit that contains `num_wires` y-rotation gates.
         The argument params[1] are the parameters you should use here to define the y-rotations.
@@ -57,11 +68,7 @@ def compare_circuits(num_wires, params):
         Returns:
             - (np.tensor): A density matrix
         """
-        # create the circuit here
-        for i,p in enumerate(params[1]):
-            qml.RY(p,wires=i)
-        # return qml.state()
-        return qml.density_matrix(wires=range(0,num_wires))
+        return mixed_qnode(params[1])
 
     # QHACK #
 
@@ -1,8 +1,14 @@
 #! /usr/bin/python3
 
+import os
 import sys
-import pennylane as qml
-from pennylane import numpy as np
+
+if os.environ.get("QHACK_BACKEND") == "numpy":
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    import pennylane as qml
+    from pennylane import numpy as np
 
 dev = qml.device("default.qubit", wires=2)
 
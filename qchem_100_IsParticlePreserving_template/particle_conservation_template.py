@@ -4,6 +4,9 @@ import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack.bits import index_to_bits, iter_basis_states, popcount
+from qhack.conservation import gates_preserve_particles, unitary_preserves_particles
+
 
 def binary_list(m, n):
     """Converts number m to binary encoded on a list of length n
@@ -16,14 +19,8 @@ def binary_list(m, n):
         - (list(int)): Binary stored as a list of length n
     """
 
-    arr = []
     # QHACK #
-    arr = list(bin(m))
-    arr = arr[2:]
-    for i in range(len(arr)):
-        arr[i] = int(arr[i])
-    while len(arr) != n:
-        arr.insert(0, 0)
+    arr = index_to_bits(m, n).tolist()
     # QHACK #
     return arr
 
@@ -36,46 +33,86 @@ def basis_states(n):
         - n(int): integer representing the number of wires in the circuit
 
     Returns:
-        - (list(list(int))): list of basis states represented as lists of 0s and 1s.
+        - (np.ndarray): array of shape (2**n, n) whose rows are the basis states as 0s and 1s; use
+        `qhack.bits.iter_basis_states` to walk them in chunks instead
     """
 
-    arr = []
-
     # QHACK #
-    m = 0
-    while m< 2**n:
-        arr.append(binary_list(m,n))
-        m = m + 1
-    
+    arr = index_to_bits(np.arange(2 ** n), n)
     # QHACK #
 
     return arr
 
 
-def is_particle_preserving(circuit, n):
+def recorded_operations(circuit, n):
+    """Runs `circuit` once on |0...0> and returns the operations of the QNode it called.
+
+    The call is intercepted at `qml.QNode.__call__` and the tape is rebuilt from the QNode with
+    `qml.workflow.construct_tape`, or read from `qnode.qtape` on PennyLane versions without it.
+
+    Args:
+        - circuit (callable): function of a basis state calling a QNode
+        - n (int): the number of wires of circuit
+
+    Returns:
+        - (list(qml.operation.Operation) or None): operations of the circuit, or None when the
+        recording is not usable (no QNode or several QNodes called, or no operation recorded)
+    """
+
+    calls = []
+    original = qml.QNode.__call__
+
+    def recording_call(self, *args, **kwargs):
+        result = original(self, *args, **kwargs)
+        calls.append((self, args, kwargs))
+        return result
+
+    qml.QNode.__call__ = recording_call
+    try:
+        circuit([0] * n)
+    finally:
+        qml.QNode.__call__ = original
+
+    if len(calls) != 1:
+        return None
+    qnode, args, kwargs = calls[0]
+    workflow = getattr(qml, "workflow", None)
+    if hasattr(workflow, "construct_tape"):
+        tape = workflow.construct_tape(qnode)(*args, **kwargs)
+    else:
+        tape = getattr(qnode, "qtape", None)
+    operations = list(tape.operations) if tape is not None else []
+    return operations or None
+
+
+def is_particle_preserving(circuit, n, method="gates"):
     """Given a circuit and its number of wires n, returns 1 if it preserves the number of particles, and 0 if it does not
 
     Args:
         - circuit (qml.QNode): A QNode that has a state such as [0,0,1,0] as an input and outputs the final state after performing
         quantum operation
         - n (int): the number of wires of circuit
+        - method (str): "gates" first checks every gate on its own wires (see `qhack.conservation`) and only
+        checks the unitary when that does not decide; "unitary" checks the Hamming-weight blocks of the
+        unitary in one pass; "simulation" runs the circuit on every basis state. When the operations cannot be
+        recorded, "gates" and "unitary" fall back to the simulation
 
     Returns:
         - (bool): True / False according to whether the input circuit preserves the number of particles or not
     """
 
     # QHACK #
-    arr = basis_states(n)
-    for a in arr:
-        op = circuit(a)
-        new_arr = []
-        for i,o in enumerate(op):
-            if o != 0:
-                new_arr.append(i)
-        in_one = a.count(1)
-        for new in new_arr:
-            out_one = binary_list(new, n).count(1)
-            if in_one != out_one:
+    if method in ("gates", "unitary"):
+        operations = recorded_operations(circuit, n)
+        if operations is not None:
+            if method == "gates" and gates_preserve_particles(operations):
+                return True
+            return unitary_preserves_particles(operations, range(n))
+
+    for chunk in iter_basis_states(n):
+        for a in chunk:
+            outputs = np.flatnonzero(np.asarray(circuit(a)) != 0)
+            if np.any(popcount(outputs) != a.sum()):
                 return False
     return True
     # QHACK #
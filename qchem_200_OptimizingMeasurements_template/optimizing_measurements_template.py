@@ -1,6 +1,9 @@
 #! /usr/bin/python3
 
 import sys
+import time
+
+from qhack.paulis import colour_groups, compatible, pack, unpack
 
 
 def check_simplification(op1, op2):
@@ -17,21 +20,8 @@ def check_simplification(op1, op2):
     """
 
     # QHACK
-    i1 = [i for i, x in enumerate(op1) if x == "I"]
-    i2 = [i for i, x in enumerate(op2) if x == "I"]
-    rule1 = []
-    for i in i1:
-        if i not in rule1:
-            rule1.append(i)
-    for i in i2:
-        if i not in rule1:
-            rule1.append(i)
-    if len(rule1) == len(op1):
-        return True
-    for i in range(len(op1)):
-        if not ((op1[i] == "I" and op2[i] != "I") or (op1[i] != "I" and op2[i] == "I") or (op1[i]==op2[i])):
-            return False
-    return True
+    x, z, _ = pack([op1, op2])
+    return bool(compatible(x[0], z[0], x[1], z[1]))
     # QHACK
 
 
@@ -49,41 +39,28 @@ def join_operators(op1, op2):
     """
 
     # QHACK
-    join = []
-    for i in range(len(op1)):
-        if op1[i] == op2[i]:
-            join.append(op1[i])
-        elif op1[i] == "I" and op2[i] != "I":
-            join.append(op2[i])
-        elif op1[i] != "I" and op2[i] == "I":
-            join.append(op1[i])
-    return join
+    x, z, n = pack([op1, op2])
+    return unpack(x[0] | x[1], z[0] | z[1], n)[0]
     # QHACK
 
 
-def optimize_measurements(obs_hamiltonian):
+def optimize_measurements(obs_hamiltonian, strategy="greedy"):
     """This function will go through the list of Pauli words provided in the statement, grouping the operators
     following the simplification process of the previous functions.
 
     Args:
         - obs_hamiltonian (list(list(str))): Groups of Pauli words making up the Hamiltonian.
+        - strategy (str): "greedy" (first-fit in input order) or a colouring of the conflict graph,
+          "largest-first", "dsatur" or "rlf" (see `qhack.paulis.STRATEGIES`).
 
     Returns:
         - (list(list(str))): The chosen Pauli operators to measure after grouping.
     """
 
-    final_solution = []
-
-    for op1 in obs_hamiltonian:
-        added = False
-        for i, op2 in enumerate(final_solution):
-
-            if check_simplification(op1, op2):
-                final_solution[i] = join_operators(op1, op2)
-                added = True
-                break
-        if not added:
-            final_solution.append(op1)
+    # "greedy" is the first-fit of `check_simplification` / `join_operators`, on packed X/Z bit masks
+    x, z, n = pack(obs_hamiltonian)
+    group_x, group_z = colour_groups(x, z, strategy)
+    final_solution = unpack(group_x, group_z, n)
 
     return final_solution
 
@@ -106,6 +83,26 @@ def compression_ratio(obs_hamiltonian, final_solution):
     # QHACK
 
 
+def compare_strategies(obs_hamiltonian, strategies=("greedy", "largest-first", "dsatur", "rlf")):
+    """Groups the Hamiltonian with several strategies.
+
+    Args:
+        - obs_hamiltonian (list(list(str))): Groups of Pauli words making up the Hamiltonian.
+        - strategies (list(str)): names of the grouping strategies
+
+    Returns:
+        - (dict): strategy -> (compression ratio, grouping time in seconds)
+    """
+
+    results = {}
+    for strategy in strategies:
+        start = time.perf_counter()
+        final_solution = optimize_measurements(obs_hamiltonian, strategy)
+        seconds = time.perf_counter() - start
+        results[strategy] = (compression_ratio(obs_hamiltonian, final_solution), seconds)
+    return results
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
 
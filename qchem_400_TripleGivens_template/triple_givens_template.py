@@ -1,6 +1,14 @@
+import os
 import sys
-import pennylane as qml
-from pennylane import numpy as np
+
+from qhack.statevector import excitation_matrix
+
+if os.environ.get("QHACK_BACKEND") == "numpy":
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    import pennylane as qml
+    from pennylane import numpy as np
 
 NUM_WIRES = 6
 
@@ -16,22 +24,8 @@ def triple_excitation_matrix(gamma):
     """
 
     # QHACK #
-    b1 = int('000111',2)
-    b2 = int('111000',2)
-    U = []
-    for i in range(64):
-        state = np.zeros(64)
-        if i == b1:
-            state[b1] = np.cos(gamma/2)
-            state[b2] = np.sin(gamma/2)
-        elif i == b2:
-            state[b1] = -np.sin(gamma/2)
-            state[b2] = np.cos(gamma/2)
-        else:
-            state[i] = 1.
-        U.append(state)
-    return np.array(U)
-            
+    # the problem rotates |000111> towards -|111000>, the opposite sense of qml.DoubleExcitation
+    return excitation_matrix(6, -float(gamma))
     # QHACK #
 
 
@@ -57,8 +51,12 @@ def circuit(angles):
     qml.PauliX(2)
     qml.SingleExcitation(alpha, wires=[0,5])
     qml.DoubleExcitation(beta, wires=[0, 1, 4, 5])
-    TripleExcitation = triple_excitation_matrix(gamma)
-    qml.QubitUnitary(TripleExcitation,wires=range(6))
+    if hasattr(qml, "Excitation"):
+        # only the amplitudes of |000111> and |111000> are updated
+        qml.Excitation(-gamma, wires=range(6))
+    else:
+        TripleExcitation = triple_excitation_matrix(gamma)
+        qml.QubitUnitary(TripleExcitation,wires=range(6))
     # QHACK #
 
     return qml.probs(wires=range(NUM_WIRES))
@@ -0,0 +1,5 @@
+"""Shared tooling for running, grading and benchmarking the QHack challenge solutions.
+
+The challenge directories stay self-contained scripts that read their input from
+`stdin`; the modules in this package drive them from a single Python process.
+"""
@@ -0,0 +1,274 @@
+"""Benchmarks of the challenge solutions with regression checks against a JSON baseline.
+
+For every case the solution's `__main__` block is run in-process (see `qhack.runner`) while
+recording the wall time, the number of QNode executions and the `tracemalloc` peak. The times
+include the tracing overhead of `tracemalloc`, which is the same for the baseline and the
+comparison run.
+
+Usage:
+    python -m qhack.benchmark --save baseline.json
+    python -m qhack.benchmark --compare baseline.json --threshold 0.25
+    python -m qhack.benchmark --generated --seed 0    # add scaled-up inputs from `qhack.generators`
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import traceback
+
+from qhack.challenges import CHALLENGES, list_cases, resolve
+from qhack.generators import benchmark_inputs
+from qhack.runner import load_challenge, run_main
+
+# challenges expected to finish faster than this get one unmeasured warm-up run, so lazy imports
+# and first-call setup inside PennyLane do not show up in their first measured case
+WARMUP_MAX_SECONDS = 5
+
+
+@contextlib.contextmanager
+def count_qnode_executions():
+    """Counts calls to every `qml.QNode` and `qhack.statevector.QNode` while the context is active.
+
+    Yields:
+        - (list(int)): single-element list holding the running count
+    """
+
+    from qhack import statevector
+
+    classes = [statevector.QNode]
+    if "pennylane" in sys.modules:
+        import pennylane as qml
+
+        classes.append(qml.QNode)
+
+    counter = [0]
+    originals = [cls.__call__ for cls in classes]
+
+    def counting(original):
+        def counting_call(self, *args, **kwargs):
+            counter[0] += 1
+            return original(self, *args, **kwargs)
+
+        return counting_call
+
+    for cls, original in zip(classes, originals):
+        cls.__call__ = counting(original)
+    try:
+        yield counter
+    finally:
+        for cls, original in zip(classes, originals):
+            cls.__call__ = original
+
+
+def benchmark_case(name, label, stdin_text):
+    """Runs one input through a challenge and measures it.
+
+    Args:
+        - name (str): challenge directory
+        - label (str): case name used as key in the baseline, e.g. "1.in"
+        - stdin_text (str): the input
+
+    Returns:
+        - (dict): with keys "challenge", "case", "seconds", "qnode_executions", "peak_bytes" and "error"
+    """
+
+    error = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    with count_qnode_executions() as counter:
+        try:
+            run_main(name, stdin_text)
+        except Exception:
+            error = traceback.format_exc(limit=-3)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "challenge": name,
+        "case": label,
+        "seconds": seconds,
+        "qnode_executions": counter[0],
+        "peak_bytes": peak,
+        "error": error,
+    }
+
+
+def shipped_inputs(name):
+    """Returns the shipped inputs of a challenge as (label, text) pairs."""
+
+    inputs = []
+    for in_path, _ in list_cases(name):
+        with open(in_path) as f:
+            inputs.append((os.path.basename(in_path), f.read()))
+    return inputs
+
+
+def warm_up(name):
+    """Runs the first shipped input of a cheap challenge once, discarding the output."""
+
+    inputs = shipped_inputs(name)
+    if inputs and CHALLENGES[name]["expected_seconds"] <= WARMUP_MAX_SECONDS:
+        try:
+            run_main(name, inputs[0][1])
+        except Exception:
+            pass
+
+
+def run_benchmarks(names=None, extra_inputs=None):
+    """Benchmarks the selected challenges on their shipped inputs.
+
+    Args:
+        - names (list(str)): challenge directories or prefixes; None selects all 25 challenges
+        - extra_inputs (dict): optional {challenge: [(label, text), ...]} with additional inputs
+
+    Returns:
+        - (list(dict)): one measurement per case, see `benchmark_case`
+    """
+
+    extra_inputs = extra_inputs or {}
+    results = []
+    for name in resolve(names):
+        try:
+            load_challenge(name)
+        except Exception:
+            error = traceback.format_exc(limit=-3)
+            results.append(
+                {
+                    "challenge": name,
+                    "case": "import",
+                    "seconds": 0.0,
+                    "qnode_executions": 0,
+                    "peak_bytes": 0,
+                    "error": error,
+                }
+            )
+            continue
+        warm_up(name)
+        for label, text in shipped_inputs(name) + list(extra_inputs.get(name, [])):
+            results.append(benchmark_case(name, label, text))
+    return results
+
+
+def to_baseline(results):
+    """Converts measurements into the JSON baseline format.
+
+    Args:
+        - results (list(dict)): measurements from `run_benchmarks`
+
+    Returns:
+        - (dict): {"meta": {...}, "cases": {"challenge/case": {"seconds", "qnode_executions", "peak_bytes"}}},
+        where a case that failed is stored as {"error": last line of the traceback}
+    """
+
+    meta = {"python": platform.python_version(), "platform": platform.platform()}
+    if "pennylane" in sys.modules:
+        meta["pennylane"] = sys.modules["pennylane"].__version__
+
+    cases = {}
+    for r in results:
+        if r["error"] is None:
+            cases[f"{r['challenge']}/{r['case']}"] = {
+                "seconds": r["seconds"],
+                "qnode_executions": r["qnode_executions"],
+                "peak_bytes": r["peak_bytes"],
+            }
+        else:
+            cases[f"{r['challenge']}/{r['case']}"] = {"error": r["error"].strip().splitlines()[-1]}
+    return {"meta": meta, "cases": cases}
+
+
+def find_regressions(baseline, results, threshold=0.25, min_seconds=0.05, min_bytes=2 ** 20):
+    """Compares measurements with a baseline.
+
+    A case regresses when a metric grows by more than `threshold` (relative). Time differences
+    smaller than `min_seconds` and memory differences smaller than `min_bytes` are treated as noise.
+    A failing case only regresses if the baseline measured it successfully: cases that already
+    failed in the baseline (e.g. solutions broken by the installed PennyLane) or that it does not
+    contain are not compared.
+
+    Args:
+        - baseline (dict): loaded baseline, see `to_baseline`
+        - results (list(dict)): new measurements
+        - threshold (float): allowed relative growth of every metric
+        - min_seconds (float): absolute noise floor for wall times
+        - min_bytes (int): absolute noise floor for memory peaks
+
+    Returns:
+        - (list(str)): human-readable description of every regression (empty if none)
+    """
+
+    regressions = []
+    for r in results:
+        key = f"{r['challenge']}/{r['case']}"
+        base = baseline["cases"].get(key)
+        if base is None or "error" in base:
+            continue
+        if r["error"] is not None:
+            regressions.append(f"{key}: failed with {r['error'].strip().splitlines()[-1]}")
+            continue
+        if r["seconds"] - base["seconds"] > min_seconds and r["seconds"] > base["seconds"] * (1 + threshold):
+            regressions.append(f"{key}: {base['seconds']:.3f}s -> {r['seconds']:.3f}s")
+        if r["qnode_executions"] > base["qnode_executions"] * (1 + threshold):
+            regressions.append(
+                f"{key}: {base['qnode_executions']} -> {r['qnode_executions']} QNode executions"
+            )
+        if r["peak_bytes"] - base["peak_bytes"] > min_bytes and r["peak_bytes"] > base["peak_bytes"] * (
+            1 + threshold
+        ):
+            regressions.append(f"{key}: peak memory {base['peak_bytes']} -> {r['peak_bytes']} bytes")
+    return regressions
+
+
+def print_results(results, stream=None):
+    """Writes one line per measurement."""
+
+    stream = stream or sys.stdout
+    for r in results:
+        key = f"{r['challenge']}/{r['case']}"
+        if r["error"] is not None:
+            print(f"{key:70s} ERROR {r['error'].strip().splitlines()[-1]}", file=stream)
+        else:
+            print(
+                f"{key:70s} {r['seconds']:9.3f}s {r['qnode_executions']:8d} qnodes "
+                f"{r['peak_bytes'] / 2 ** 20:9.2f} MiB",
+                file=stream,
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenges", nargs="*", help="challenge directories or prefixes")
+    parser.add_argument("--save", help="write the measurements as a JSON baseline")
+    parser.add_argument("--compare", help="baseline to check the measurements against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative growth")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore smaller time differences")
+    parser.add_argument("--generated", action="store_true", help="also run generated benchmark-size inputs")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated inputs")
+    args = parser.parse_args(argv)
+
+    extra_inputs = benchmark_inputs(args.challenges, args.seed) if args.generated else None
+    results = run_benchmarks(args.challenges, extra_inputs)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(to_baseline(results), f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(baseline, results, args.threshold, args.min_seconds)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Bit-string utilities on NumPy arrays.
+
+Computational basis states are handled as integer indices, the first wire being the most
+significant bit as in PennyLane, and converted to arrays of bits only when needed. Enumerating
+all 2^n basis states is done in chunks, so walking them needs O(chunk * n) memory instead of a
+Python list of 2^n lists. `gray_code_ry` uses the same parity counting for the Gray-code
+decomposition of uniformly controlled rotations, which every backend can apply.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount(x):
+    """Number of ones in the binary representation of non-negative integers below 2^64.
+
+    Args:
+        - x (int or np.ndarray): integers
+
+    Returns:
+        - (np.ndarray): number of ones of every integer, as int64
+    """
+
+    # parallel bit counting: sums of 2, 4 and 8 bits, then the bytes added by one multiplication
+    x = np.asarray(x).astype(np.uint64)
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).astype(np.int64)
+
+
+@lru_cache(maxsize=32)
+def popcount_table(n_wires):
+    """Hamming weights of the basis states 0 .. 2^n - 1, cached and read-only.
+
+    Args:
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): array of length 2^n
+    """
+
+    table = popcount(np.arange(2 ** n_wires))
+    table.setflags(write=False)
+    return table
+
+
+def index_to_bits(indices, n_wires):
+    """Bits of basis-state indices, first wire (most significant bit) first.
+
+    Args:
+        - indices (int or np.ndarray): basis-state indices
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): uint8 array of shape indices.shape + (n_wires,)
+    """
+
+    shifts = np.arange(n_wires - 1, -1, -1, dtype=np.int64)
+    return ((np.asarray(indices, dtype=np.int64)[..., None] >> shifts) & 1).astype(np.uint8)
+
+
+def bits_to_index(bits):
+    """Basis-state indices of bit arrays, first wire (most significant bit) first.
+
+    Args:
+        - bits (np.ndarray): array of shape (..., n_wires) of zeros and ones
+
+    Returns:
+        - (np.ndarray or int): indices of shape bits.shape[:-1]
+    """
+
+    bits = np.asarray(bits, dtype=np.int64)
+    weights = np.int64(1) << np.arange(bits.shape[-1] - 1, -1, -1, dtype=np.int64)
+    index = bits @ weights
+    return int(index) if np.ndim(index) == 0 else index
+
+
+def iter_basis_states(n_wires, chunk=4096):
+    """Yields all basis states of `n_wires` wires as blocks of bit rows, in increasing index order.
+
+    Args:
+        - n_wires (int): number of wires
+        - chunk (int): number of basis states per block
+
+    Yields:
+        - (np.ndarray): uint8 array of shape (<= chunk, n_wires)
+    """
+
+    for start in range(0, 2 ** n_wires, chunk):
+        yield index_to_bits(np.arange(start, min(start + chunk, 2 ** n_wires)), n_wires)
+
+
+def gray_code_ry(thetas):
+    """Decomposition of a uniformly controlled RY into RY and CNOT gates, in Gray-code order.
+
+    For k controls the rotation is the sequence RY(alpha_i) on the target followed by a CNOT from
+    the control whose bit changes between the Gray codes of i and i + 1 (cyclically). Before step i
+    the target has been flipped by the parity of (gray(i) & j) on control state j, so
+    theta_j = sum_i (-1)^popcount(gray(i) & j) alpha_i; the matrix is orthogonal up to a factor 2^k,
+    which gives alpha = M^T theta / 2^k.
+
+    Args:
+        - thetas (np.ndarray): 2^k angles, indexed by the control state (first control most significant)
+
+    Returns:
+        - (list(tuple(float, int))): (alpha_i, position of the CNOT control among the controls);
+        without controls the single position is None
+    """
+
+    thetas = np.asarray(thetas, dtype=float)
+    k = int(np.log2(len(thetas)))
+    if 2 ** k != len(thetas):
+        raise ValueError(f"expected 2^k angles, got {len(thetas)}")
+    if k == 0:
+        return [(float(thetas[0]), None)]
+    i = np.arange(2 ** k)
+    gray = i ^ (i >> 1)
+    signs = 1 - 2 * (popcount(np.bitwise_and.outer(i, gray)) % 2)
+    alphas = signs.T @ thetas / 2 ** k
+    changed = gray ^ np.roll(gray, -1)
+    positions = k - 1 - np.log2(changed).astype(int)
+    return [(float(a), int(p)) for a, p in zip(alphas, positions)]
@@ -0,0 +1,242 @@
+"""Registry of the 25 challenge directories and the grading specs from their `problem.pdf`."""
+
+import glob
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# tolerance: relative tolerance from the "Specs" section (None means the output must match exactly)
+# time_limit: seconds allowed per test case
+# compare: "exact", "numeric" or "accuracy" (fraction of matching entries must reach the tolerance)
+# expected_seconds: rough cost of grading all shipped cases, used to schedule the slowest challenges first
+CHALLENGES = {
+    "algorithms_100_DeutschJozsa_template": {
+        "script": "deutsch_jozsa_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "algorithms_200_AdaptingTopology_template": {
+        "script": "adapting_topology_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "algorithms_300_AdderQFT_template": {
+        "script": "adder_QFT_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "algorithms_400_QuantumCounting_template": {
+        "script": "quantum_counting_template.py",
+        "tolerance": None,
+        "time_limit": 30,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "algorithms_500_DeutschJozsaStrikesAgain_template": {
+        "script": "deustch_jozsa_strikes_again_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "games_100_TardigradeMasquerade_template": {
+        "script": "tardigrade_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "games_200_CHSH_template": {
+        "script": "CHSH_game_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 5,
+    },
+    "games_300_Elitzur_Vaidman_template": {
+        "script": "Elitzur_Vaidman_template.py",
+        "tolerance": 0.05,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "games_400_FindTheCar_template": {
+        "script": "find_the_car_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "games_500_switches_template": {
+        "script": "game_switches_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "pennylane101_100_OrderMatters_template": {
+        "script": "order_matters_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "pennylane101_200_KnowYourDevices_template": {
+        "script": "know_your_devices_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "pennylane101_300_superdense_coding_template": {
+        "script": "superdense_coding_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "pennylane101_400_FiniteDifferenceGradient_template": {
+        "script": "finite_difference_template.py",
+        "tolerance": 5e-3,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "pennylane101_500_BitflipErrorCode_template": {
+        "script": "bitflip_error_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "qchem_100_IsParticlePreserving_template": {
+        "script": "particle_conservation_template.py",
+        "tolerance": None,
+        "time_limit": 60,
+        "compare": "exact",
+        "expected_seconds": 1,
+    },
+    "qchem_200_OptimizingMeasurements_template": {
+        "script": "optimizing_measurements_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "qchem_300_Universality_Givens_template": {
+        "script": "universality_givens_template.py",
+        "tolerance": 1e-6,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "qchem_400_TripleGivens_template": {
+        "script": "triple_givens_template.py",
+        "tolerance": 1e-4,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "qchem_500_MindTheGap_template": {
+        "script": "mind_the_gap_template.py",
+        "tolerance": 0.01,
+        "time_limit": 80,
+        "compare": "numeric",
+        "expected_seconds": 3,
+    },
+    "qml_100_GeneratingFourierState_template": {
+        "script": "generating_fourier_state_template.py",
+        "tolerance": 1e-3,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 21,
+    },
+    "qml_200_WhoLikesTheBeatles_template": {
+        "script": "who_likes_the_beatles_template.py",
+        "tolerance": 1e-3,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "qml_300_IsingOnTheCake_template": {
+        "script": "ising_classifier_template.py",
+        "tolerance": 0.9,
+        "time_limit": 90,
+        "compare": "accuracy",
+        "expected_seconds": 48,
+    },
+    "qml_400_BuildingQRAM_template": {
+        "script": "building_QRAM_template.py",
+        "tolerance": 1e-3,
+        "time_limit": 60,
+        "compare": "numeric",
+        "expected_seconds": 1,
+    },
+    "qml_500_UDMIS_template": {
+        "script": "udmis_template.py",
+        "tolerance": 1e-3,
+        "time_limit": 80,
+        "compare": "numeric",
+        "expected_seconds": 64,
+    },
+}
+
+
+def script_path(name):
+    """Returns the absolute path of the solution script of a challenge.
+
+    Args:
+        - name (str): challenge directory, e.g. "games_200_CHSH_template"
+
+    Returns:
+        - (str): path to the `.py` file
+    """
+
+    return os.path.join(ROOT, name, CHALLENGES[name]["script"])
+
+
+def list_cases(name):
+    """Lists the shipped test cases of a challenge.
+
+    Args:
+        - name (str): challenge directory
+
+    Returns:
+        - (list(tuple(str, str))): pairs of (`#.in`, `#.ans`) paths, sorted by case number
+    """
+
+    cases = []
+    for in_path in sorted(glob.glob(os.path.join(ROOT, name, "*.in"))):
+        ans_path = in_path[: -len(".in")] + ".ans"
+        if os.path.exists(ans_path):
+            cases.append((in_path, ans_path))
+    return cases
+
+
+def resolve(names):
+    """Expands user-supplied challenge names or prefixes (such as "games" or "qml_500") to directory names.
+
+    Args:
+        - names (list(str)): challenge names or prefixes; an empty list selects every challenge
+
+    Returns:
+        - (list(str)): challenge directory names, without duplicates
+    """
+
+    if not names:
+        return list(CHALLENGES)
+
+    resolved = []
+    for name in names:
+        name = os.path.basename(os.path.normpath(name))
+        matches = [name] if name in CHALLENGES else [c for c in CHALLENGES if c.startswith(name)]
+        if not matches:
+            raise ValueError(f"'{name}' does not match any challenge")
+        resolved.extend(m for m in matches if m not in resolved)
+    return resolved
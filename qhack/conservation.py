@@ -0,0 +1,168 @@
+"""Particle-number conservation decided from the gates of a circuit.
+
+A circuit preserves the number of particles (the Hamming weight of the basis states) when its
+unitary commutes with the number operator N. That is the case as soon as every gate commutes with
+the number operator of its own wires, which is known for the usual quantum chemistry gates and
+otherwise follows from the gate's small local matrix: no nonzero entry may connect basis states
+of different weights. This check costs O(#gates) instead of simulating all 2^n basis states.
+
+The converse does not hold (PauliX twice on a wire preserves the number of particles), so when
+some gate fails the local check the circuit has to be simulated to decide.
+`unitary_preserves_particles` does that in a single pass: all basis states of the same weight are
+pushed through the gates together as the columns of one array, and the check stops at the first
+weight whose block leaks into other weights.
+"""
+
+from math import comb
+
+import numpy as np
+
+from qhack.bits import popcount_table
+from qhack.statevector import apply_matrix
+
+# gates that commute with the number operator of their wires, whatever their parameters
+NUMBER_PRESERVING = frozenset(
+    {
+        "Identity",
+        "PauliZ",
+        "S",
+        "T",
+        "RZ",
+        "PhaseShift",
+        "U1",
+        "CZ",
+        "CRZ",
+        "ControlledPhaseShift",
+        "CPhase",
+        "SWAP",
+        "ISWAP",
+        "SISWAP",
+        "SQISW",
+        "IsingZZ",
+        "IsingXY",
+        "MultiRZ",
+        "SingleExcitation",
+        "SingleExcitationPlus",
+        "SingleExcitationMinus",
+        "DoubleExcitation",
+        "DoubleExcitationPlus",
+        "DoubleExcitationMinus",
+        "Excitation",
+        "OrbitalRotation",
+        "FermionicSWAP",
+    }
+)
+
+# gates on more wires than this are treated as opaque instead of building their matrix
+MAX_LOCAL_WIRES = 10
+
+
+def _local_matrix(op):
+    """Matrix of `op` on its wires, or None if it is not available."""
+
+    try:
+        matrix = op.matrix
+        return np.asarray(matrix() if callable(matrix) else matrix)
+    except Exception:
+        return None
+
+
+def gate_preserves_particles(op, atol=1e-10):
+    """Whether a single gate commutes with the number operator of its wires.
+
+    Args:
+        - op: operation with `name` and `wires` (and a `matrix` for gates not in `NUMBER_PRESERVING`)
+        - atol (float): entries smaller than this count as zero
+
+    Returns:
+        - (bool or None): None when the gate is opaque (no matrix, or more than `MAX_LOCAL_WIRES`
+        wires)
+    """
+
+    name = op.name[:-4] if op.name.endswith(".inv") else op.name
+    if name in NUMBER_PRESERVING:
+        return True
+    if len(op.wires) > MAX_LOCAL_WIRES:
+        return None
+    matrix = _local_matrix(op)
+    if matrix is None or matrix.shape != (2 ** len(op.wires),) * 2:
+        return None
+    weights = popcount_table(len(op.wires))
+    rows, cols = np.nonzero(np.abs(matrix) > atol)
+    return bool(np.all(weights[rows] == weights[cols]))
+
+
+def gates_preserve_particles(operations):
+    """Whether every gate of a circuit preserves the number of particles.
+
+    State preparations (`BasisState`) are skipped. True proves that the circuit preserves the
+    number of particles; False or None only means that the gates alone do not decide it.
+
+    Args:
+        - operations (list): operations of the circuit
+
+    Returns:
+        - (bool or None): True if all gates preserve the number of particles, False if one of them
+        does not, None if some gate is opaque and none fails, or if `operations` is empty
+    """
+
+    if not operations:
+        return None
+    result = True
+    for op in operations:
+        if op.name == "BasisState":
+            continue
+        preserves = gate_preserves_particles(op)
+        if preserves is False:
+            return False
+        if preserves is None:
+            result = None
+    return result
+
+
+def unitary_preserves_particles(operations, wires, atol=1e-10):
+    """Whether a circuit preserves the number of particles, from the blocks of its unitary.
+
+    The columns of the unitary are computed one Hamming-weight block at a time, smallest blocks
+    first, by applying every gate to all basis states of that weight at once. The circuit
+    preserves the number of particles when no block has a nonzero entry outside its own weight.
+
+    Args:
+        - operations (list): operations of the circuit; `BasisState` preparations are skipped
+        - wires (list): wires of the circuit, the first one being the most significant bit
+        - atol (float): amplitudes smaller than this count as zero
+
+    Returns:
+        - (bool): True if the circuit preserves the number of particles
+
+    Raises:
+        - ValueError: if a gate has no matrix, or if `operations` is empty on a nonempty set of
+          wires (an empty recording is more likely a failed one than the identity circuit)
+    """
+
+    wires = list(wires)
+    n = len(wires)
+    if n and not operations:
+        raise ValueError("no operations to check")
+    index = {w: i for i, w in enumerate(wires)}
+    gates = []
+    for op in operations:
+        if op.name == "BasisState":
+            continue
+        matrix = _local_matrix(op)
+        if matrix is None:
+            raise ValueError(f"{op.name} has no matrix")
+        gates.append((matrix, [index[w] for w in op.wires]))
+
+    weights = popcount_table(n)
+    for weight in sorted(range(n + 1), key=lambda w: comb(n, w)):
+        columns = np.flatnonzero(weights == weight)
+        block = np.zeros((2 ** n, len(columns)), dtype=complex)
+        block[columns, np.arange(len(columns))] = 1
+        state = block.reshape((2,) * n + (len(columns),))
+        for matrix, axes in gates:
+            state = apply_matrix(state, matrix, axes)
+        leaked = state.reshape(2 ** n, -1)[weights != weight]
+        if np.any(np.abs(leaked) > atol):
+            return False
+    return True
@@ -0,0 +1,134 @@
+"""Memoizing factory for PennyLane devices and QNodes.
+
+Several solutions build a fresh `qml.device` and `@qml.qnode` every time a function is called
+(e.g. `distance` in the Beatles challenge runs once per dataset row). `get_device` and
+`get_qnode` return cached objects instead, keyed on the device name, wire labels and shots (plus
+the quantum function and QNode options for QNodes). Both caches are bounded LRU caches with
+hit/miss counters.
+
+Quantum functions are cached by identity, so they should be defined at module level and receive
+everything they need as arguments; a closure re-created on each call would never hit the cache.
+
+Devices and QNodes come from PennyLane unless the call site passes another `backend` module with
+`device` and `QNode`, such as `qhack.statevector`. A quantum function must use the gates of the
+same backend, so the choice belongs to the template that builds it, e.g. after its own
+`QHACK_BACKEND` switch.
+"""
+
+import os
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_MAXSIZE = 64
+_caches = {"devices": OrderedDict(), "qnodes": OrderedDict()}
+_stats = {"devices": [0, 0], "qnodes": [0, 0]}
+
+
+def _wires_key(wires):
+    """Normalises a wires argument (int, range, list of labels) into a hashable key."""
+
+    if isinstance(wires, int):
+        return wires
+    return tuple(wires)
+
+
+def _lookup(cache_name, key, build):
+    """Returns the cached value for `key`, building and storing it (evicting the oldest entry) on a miss."""
+
+    cache, stats = _caches[cache_name], _stats[cache_name]
+    if key in cache:
+        stats[0] += 1
+        cache.move_to_end(key)
+        return cache[key]
+
+    stats[1] += 1
+    value = build()
+    cache[key] = value
+    while len(cache) > _MAXSIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def _backend(backend):
+    """The module providing `device` and `QNode`: `backend`, or PennyLane by default."""
+
+    if backend is not None:
+        return backend
+
+    import pennylane
+
+    return pennylane
+
+
+def get_device(name, wires, shots=None, backend=None):
+    """Returns a cached device, creating it on first use.
+
+    Args:
+        - name (str): device name, e.g. "default.qubit"
+        - wires (int or iterable): number of wires or wire labels
+        - shots (int): number of shots, None for analytic results
+        - backend (module): `pennylane` (the default) or `qhack.statevector`
+
+    Returns:
+        - (Device): the device
+    """
+
+    qml = _backend(backend)
+    key = (qml.__name__, name, _wires_key(wires), shots)
+    return _lookup("devices", key, lambda: qml.device(name, wires=wires, shots=shots))
+
+
+def get_qnode(func, name, wires, shots=None, backend=None, **qnode_kwargs):
+    """Returns a cached QNode of `func` on a cached device.
+
+    Args:
+        - func (callable): module-level quantum function
+        - name (str): device name, e.g. "default.qubit"
+        - wires (int or iterable): number of wires or wire labels
+        - shots (int): number of shots, None for analytic results
+        - backend (module): `pennylane` (the default) or `qhack.statevector`; the gates queued by
+          `func` must come from the same module
+        - qnode_kwargs: extra arguments for `qml.QNode` (e.g. `diff_method`)
+
+    Returns:
+        - (QNode): the QNode
+    """
+
+    qml = _backend(backend)
+    key = (qml.__name__, func, name, _wires_key(wires), shots, tuple(sorted(qnode_kwargs.items())))
+    return _lookup("qnodes", key, lambda: qml.QNode(func, get_device(name, wires, shots, qml), **qnode_kwargs))
+
+
+def cache_info():
+    """Hit/miss statistics of both caches.
+
+    Returns:
+        - (dict(str, CacheInfo)): statistics under the keys "devices" and "qnodes"
+    """
+
+    return {
+        name: CacheInfo(_stats[name][0], _stats[name][1], _MAXSIZE, len(_caches[name])) for name in _caches
+    }
+
+
+def clear_cache():
+    """Empties both caches and resets their statistics."""
+
+    for name in _caches:
+        _caches[name].clear()
+        _stats[name][:] = [0, 0]
+
+
+def set_maxsize(maxsize):
+    """Changes the capacity of each cache, evicting the least recently used entries if needed.
+
+    Args:
+        - maxsize (int): maximum number of devices and of QNodes kept alive
+    """
+
+    global _MAXSIZE
+    _MAXSIZE = maxsize
+    for cache in _caches.values():
+        while len(cache) > _MAXSIZE:
+            cache.popitem(last=False)
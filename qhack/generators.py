@@ -0,0 +1,391 @@
+"""Deterministic, seeded input generators for every challenge.
+
+Each generator returns text in exactly the format parsed by the `__main__` block of the solution,
+so generated inputs can be fed to the scripts through `stdin`, to `qhack.runner.run_main` or to the
+benchmarks (`python -m qhack.benchmark --generated`). The meaning of `size` depends on the
+challenge (number of wires, dataset rows, Pauli words, ...) and is listed in `GENERATORS`.
+
+Usage:
+    python -m qhack.generators qchem_200 --size 100000 --seed 1 > big.in
+    python -m qhack.generators --out-dir generated        # every challenge at its benchmark size
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+from qhack.challenges import resolve
+
+
+def _floats(values):
+    return ",".join(repr(float(v)) for v in values)
+
+
+def _ints(values):
+    return ",".join(str(int(v)) for v in values)
+
+
+def deutsch_jozsa(size, rng):
+    """`size` CNOTs from the two input wires onto the output wire."""
+
+    return _ints(rng.randrange(2) for _ in range(size))
+
+
+def adapting_topology(size, rng):
+    """Control and target of a CNOT on the 9-qubit hardware graph (`size` is ignored)."""
+
+    control, target = rng.sample(range(9), 2)
+    return _ints([control, target])
+
+
+def adder_qft(size, rng):
+    """Addend `m` for a register of `size` wires."""
+
+    return _ints([rng.randrange(2 ** size), size])
+
+
+def quantum_counting(size, rng):
+    """`size` marked elements out of the 16 of the search space."""
+
+    return _ints(sorted(rng.sample(range(16), min(max(size, 1), 15))))
+
+
+def deutsch_jozsa_strikes_again(size, rng):
+    """Four two-CNOT oracles that are either all of the same type or two and two (`size` is ignored)."""
+
+    def oracle(balanced):
+        a = rng.randrange(2)
+        return [a, 1 - a] if balanced else [a, a]
+
+    types = [rng.random() < 0.5] * 4 if rng.random() < 0.5 else rng.sample([True, True, False, False], 4)
+    return _ints(i for t in types for i in oracle(t))
+
+
+def tardigrade(size, rng):
+    """Angle theta of the tardigrade state (`size` is ignored)."""
+
+    return repr(rng.uniform(0, 2 * math.pi))
+
+
+def chsh(size, rng):
+    """Coefficients alpha and beta of the entangled state (`size` is ignored)."""
+
+    return _floats([rng.uniform(0.05, 1), rng.uniform(0.05, 1)])
+
+
+def elitzur_vaidman(size, rng):
+    """Beam-splitter angle and `size` concatenated bomb circuits."""
+
+    return f"{rng.uniform(0.1, math.pi / 2)!r},{size}"
+
+
+def find_the_car(size, rng):
+    """Door encoded as two bits (`size` is ignored)."""
+
+    return _ints([rng.randrange(2), rng.randrange(2)])
+
+
+def switches(size, rng):
+    """`size` CNOTs from the three switches onto the light."""
+
+    return _ints(rng.randrange(3) for _ in range(size))
+
+
+def order_matters(size, rng):
+    """Two rotation angles (`size` is ignored)."""
+
+    return _floats([rng.uniform(0, 2 * math.pi), rng.uniform(0, 2 * math.pi)])
+
+
+def know_your_devices(size, rng):
+    """Two sets of `size` RY angles."""
+
+    return _ints([size]) + "," + _floats(rng.uniform(0, 2 * math.pi) for _ in range(2 * size))
+
+
+def superdense_coding(size, rng):
+    """Alice's two bits and the entangling angle (`size` is ignored)."""
+
+    return f"{rng.randrange(4)},{rng.uniform(0, math.pi / 2)!r}"
+
+
+def finite_difference(size, rng):
+    """Six parameters of the variational circuit (`size` is ignored)."""
+
+    return _floats(rng.random() for _ in range(6))
+
+
+def bitflip(size, rng):
+    """Bit-flip probability, state amplitude and tampered wire (`size` is ignored)."""
+
+    return f"{rng.random()!r},{rng.random()!r},{rng.randrange(3)}"
+
+
+# (name, number of wires, number of parameters) of gates the particle conservation script can parse
+_PRESERVING_GATES = [("SingleExcitation", 2, 1), ("DoubleExcitation", 4, 1), ("SWAP", 2, 0), ("CZ", 2, 0), ("RZ", 1, 1)]
+_BREAKING_GATES = [("Hadamard", 1, 0), ("PauliX", 1, 0), ("CNOT", 2, 0), ("RX", 1, 1)]
+
+
+def particle_conservation(size, rng):
+    """Circuit of `3 * size` gates on `size` wires; about half of the circuits preserve particles."""
+
+    size = max(size, 4)
+    gates = _PRESERVING_GATES if rng.random() < 0.5 else _PRESERVING_GATES + _BREAKING_GATES
+    tokens = [str(size)]
+    for _ in range(3 * size):
+        name, num_wires, num_params = rng.choice(gates)
+        tokens.append(name)
+        tokens.append(_ints(rng.sample(range(size), num_wires)))
+        if num_params:
+            tokens.append(_floats(rng.uniform(0, 2 * math.pi) for _ in range(num_params)))
+    return ";".join(tokens)
+
+
+def optimizing_measurements(size, rng, n_qubits=8):
+    """`size` Pauli words on `n_qubits` qubits, each factor being the identity with probability 1/2."""
+
+    letters = [rng.choice("IIIXYZ") for _ in range(size * n_qubits)]
+    return f"{n_qubits}," + ",".join(letters)
+
+
+def _normalized(values):
+    norm = math.sqrt(sum(v * v for v in values))
+    return [v / norm for v in values]
+
+
+def universality_givens(size, rng):
+    """Four normalised real amplitudes (`size` is ignored)."""
+
+    return _floats(_normalized([rng.uniform(0.1, 1), rng.uniform(-1, -0.1), rng.uniform(-1, 1), rng.uniform(-1, 1)]))
+
+
+def triple_givens(size, rng):
+    """Angles alpha, beta and gamma (`size` is ignored)."""
+
+    return _floats(rng.uniform(0, 2 * math.pi) for _ in range(3))
+
+
+def mind_the_gap(size, rng):
+    """Half the H-H bond length, in Bohr (`size` is ignored)."""
+
+    return f"{rng.uniform(0.5, 1.0):.4f}"
+
+
+def generating_fourier_state(size, rng):
+    """Register of `size` qubits and the basis state `m` to prepare."""
+
+    return _ints([size, rng.randrange(2 ** size)])
+
+
+def who_likes_the_beatles(size, rng):
+    """New person, `k` and a dataset of `size` labelled people."""
+
+    k = max(1, min(size, 2 * rng.randrange(1, 4) - 1))
+    tokens = [str(rng.randint(10, 80)), str(rng.randint(0, 300)), str(k)]
+    for _ in range(size):
+        age, minutes = rng.randint(10, 80), rng.randint(0, 300)
+        likes = rng.random() < (0.8 if minutes > 100 else 0.3)
+        tokens += [str(age), str(minutes), "YES" if likes else "NO"]
+    return ",".join(tokens)
+
+
+def ising(size, rng, data_size=250):
+    """`data_size` configurations of `size` spins labelled 1 (ordered) or -1 (disordered)."""
+
+    rows = []
+    for _ in range(data_size):
+        if rng.random() < 0.5:
+            spin = rng.randrange(2)
+            row = [spin if rng.random() > 0.05 else 1 - spin for _ in range(size)] + [1]
+        else:
+            row = [rng.randrange(2) for _ in range(size)] + [-1]
+        rows.append(_ints(row))
+    return ",".join(rows)
+
+
+def building_qram(size, rng):
+    """One RY angle per address of a QRAM with `size` address qubits."""
+
+    return _floats(rng.uniform(0, math.pi) for _ in range(2 ** size))
+
+
+def udmis(size, rng):
+    """`size` vertices uniformly placed in a square with about two unit-disk neighbours per vertex.
+
+    Generation is linear in `size`, but the solution simulates one qubit per vertex and its
+    `edges` compares every pair of vertices, so it only runs up to about 20 vertices. Use
+    `unit_disk_edges` for the edges of larger graphs.
+    """
+
+    side = math.sqrt(size * math.pi / 2)
+    xs = [rng.uniform(0, side) for _ in range(size)]
+    ys = [rng.uniform(0, side) for _ in range(size)]
+    return _floats(xs + ys)
+
+
+def unit_disk_edges(xs, ys, radius=1.0):
+    """Edges of the unit-disk graph of a set of points, without comparing every pair.
+
+    The points are hashed into square cells of side `radius`, so only points in the same or in
+    adjacent cells are compared and the cost is linear in the number of points and edges.
+
+    Args:
+        - xs (list(float)): x coordinates
+        - ys (list(float)): y coordinates
+        - radius (float): vertices at most this far apart are connected, as in `udmis_template.edges`
+
+    Returns:
+        - (list((int, int))): sorted pairs (i, j) with i < j
+    """
+
+    cells = {}
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        cells.setdefault((math.floor(x / radius), math.floor(y / radius)), []).append(i)
+
+    edges = []
+    for (cx, cy), members in cells.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            others = members if (dx, dy) == (0, 0) else cells.get((cx + dx, cy + dy), [])
+            for a in members:
+                for b in others:
+                    if (dx, dy) == (0, 0) and b <= a:
+                        continue
+                    if math.hypot(xs[a] - xs[b], ys[a] - ys[b]) <= radius:
+                        edges.append((min(a, b), max(a, b)))
+    return sorted(edges)
+
+
+def coupling_graph(n_qubits, seed=0, extra_edges=None):
+    """Random connected hardware graph in the adjacency format of `adapting_topology_template.graph`.
+
+    A random spanning tree is extended with `extra_edges` random couplings (default `n_qubits // 2`).
+    The graph is built from adjacency sets, in time linear in the number of qubits and couplings.
+
+    Args:
+        - n_qubits (int): number of physical qubits
+        - seed (int): random seed
+        - extra_edges (int): couplings added on top of the spanning tree
+
+    Returns:
+        - (dict(int, list(int))): neighbours of every qubit
+    """
+
+    rng = random.Random(seed)
+    graph = {q: set() for q in range(n_qubits)}
+
+    def connect(a, b):
+        if a != b:
+            graph[a].add(b)
+            graph[b].add(a)
+
+    order = list(range(n_qubits))
+    rng.shuffle(order)
+    for i in range(1, n_qubits):
+        connect(order[i], order[rng.randrange(i)])
+    for _ in range(n_qubits // 2 if extra_edges is None else extra_edges):
+        connect(rng.randrange(n_qubits), rng.randrange(n_qubits))
+
+    return {q: sorted(neighbours) for q, neighbours in graph.items()}
+
+
+# challenge -> (generator, default size, benchmark size)
+GENERATORS = {
+    "algorithms_100_DeutschJozsa_template": (deutsch_jozsa, 2, 64),
+    "algorithms_200_AdaptingTopology_template": (adapting_topology, 1, 1),
+    "algorithms_300_AdderQFT_template": (adder_qft, 4, 10),
+    "algorithms_400_QuantumCounting_template": (quantum_counting, 3, 8),
+    "algorithms_500_DeutschJozsaStrikesAgain_template": (deutsch_jozsa_strikes_again, 1, 1),
+    "games_100_TardigradeMasquerade_template": (tardigrade, 1, 1),
+    "games_200_CHSH_template": (chsh, 1, 1),
+    "games_300_Elitzur_Vaidman_template": (elitzur_vaidman, 5, 8),
+    "games_400_FindTheCar_template": (find_the_car, 1, 1),
+    "games_500_switches_template": (switches, 4, 32),
+    "pennylane101_100_OrderMatters_template": (order_matters, 1, 1),
+    "pennylane101_200_KnowYourDevices_template": (know_your_devices, 4, 8),
+    "pennylane101_300_superdense_coding_template": (superdense_coding, 1, 1),
+    "pennylane101_400_FiniteDifferenceGradient_template": (finite_difference, 1, 1),
+    "pennylane101_500_BitflipErrorCode_template": (bitflip, 1, 1),
+    "qchem_100_IsParticlePreserving_template": (particle_conservation, 4, 6),
+    "qchem_200_OptimizingMeasurements_template": (optimizing_measurements, 4, 2000),
+    "qchem_300_Universality_Givens_template": (universality_givens, 1, 1),
+    "qchem_400_TripleGivens_template": (triple_givens, 1, 1),
+    "qchem_500_MindTheGap_template": (mind_the_gap, 1, 1),
+    "qml_100_GeneratingFourierState_template": (generating_fourier_state, 3, 4),
+    "qml_200_WhoLikesTheBeatles_template": (who_likes_the_beatles, 7, 200),
+    "qml_300_IsingOnTheCake_template": (ising, 4, 5),
+    "qml_400_BuildingQRAM_template": (building_qram, 3, 3),
+    "qml_500_UDMIS_template": (udmis, 6, 6),
+}
+
+# further benchmark inputs: challenge -> [(size, generator options)]
+BENCHMARK_EXTRAS = {
+    # the target scale of the bit-mask grouping: 10^5 Pauli words on 120 qubits
+    "qchem_200_OptimizingMeasurements_template": [(100000, {"n_qubits": 120})],
+}
+
+
+def generate(name, size=None, seed=0, **options):
+    """Generates one input for a challenge.
+
+    Args:
+        - name (str): challenge directory
+        - size (int): problem size, see `GENERATORS`; None uses the default size
+        - seed (int): random seed, equal seeds give identical inputs
+        - options: extra keyword arguments of the generator (e.g. `n_qubits` for qchem_200)
+
+    Returns:
+        - (str): the input text, ready to be piped into the solution
+    """
+
+    function, default_size, _ = GENERATORS[name]
+    return function(default_size if size is None else size, random.Random(seed), **options)
+
+
+def benchmark_inputs(names=None, seed=0):
+    """Generated inputs at the benchmark size of every selected challenge, plus `BENCHMARK_EXTRAS`.
+
+    Args:
+        - names (list(str)): challenge directories or prefixes; None selects all challenges
+        - seed (int): random seed
+
+    Returns:
+        - (dict): {challenge: [(label, text)]}, the `extra_inputs` format of `qhack.benchmark.run_benchmarks`
+    """
+
+    inputs = {}
+    for name in resolve(names):
+        size = GENERATORS[name][2]
+        inputs[name] = [(f"gen-{size}-{seed}", generate(name, size, seed))]
+        for size, options in BENCHMARK_EXTRAS.get(name, []):
+            label = "-".join(["gen", str(size)] + [f"{k}{v}" for k, v in sorted(options.items())] + [str(seed)])
+            inputs[name].append((label, generate(name, size, seed, **options)))
+    return inputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenges", nargs="*", help="challenge directories or prefixes")
+    parser.add_argument("--size", type=int, default=None, help="problem size (default: per challenge)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out-dir", help="write <out-dir>/<challenge>/gen-<size>-<seed>.in files")
+    args = parser.parse_args(argv)
+
+    names = resolve(args.challenges)
+    if args.out_dir is None:
+        for name in names:
+            print(generate(name, args.size, args.seed))
+        return 0
+
+    for name in names:
+        size = GENERATORS[name][2] if args.size is None else args.size
+        directory = os.path.join(args.out_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"gen-{size}-{args.seed}.in"), "w") as f:
+            f.write(generate(name, size, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Grover operator and quantum counting without dense matrices.
+
+The quantum counting challenge builds the Grover operator as a dense 2^n x 2^n matrix and hands
+controlled powers of it to `QuantumPhaseEstimation`, which limits it to a handful of qubits.
+`GroverOperator` applies the same operator, a diagonal sign oracle followed by the rank-one
+diffusion 2|s><s| - I, to a state in O(2^n) time and memory.
+
+`phase_estimation_probs` returns the distribution of the estimation register of quantum phase
+estimation without simulating that register. After the controlled powers and the inverse QFT the
+probability of outcome j is || sum_k w^(-jk) U^k |psi> ||^2 / N^2 with w = exp(2 pi i / N) and
+N = 2^t; expanding the norm, it only depends on the overlaps a_m = <psi| U^m |psi>, which take
+N - 1 applications of U to compute. Counting 2^22 elements with 4 estimation wires therefore
+takes 15 applications of the operator to a single vector.
+
+For counting, `spectral_probs` goes further: |s> lies in the plane of the marked and unmarked
+superpositions, where the Grover operator is a rotation by theta with sin^2(theta / 2) = M / 2^n,
+so |s> is an equal mix of the eigenvectors with eigenvalues exp(+-i theta). The distribution is
+then the average of two Fejer kernels, which only depends on M and is evaluated directly for any
+number of estimation wires and arrays of M.
+"""
+
+import numpy as np
+
+
+class GroverOperator:
+    """Grover operator D O of a search space of 2^n elements.
+
+    O flips the sign of the marked elements and D = 2|s><s| - I reflects about the uniform
+    superposition |s>, as in `grover_operator` of the quantum counting challenge.
+
+    Args:
+        - n_wires (int): number of qubits of the search space
+        - indices (list(int)): marked elements
+    """
+
+    def __init__(self, n_wires, indices):
+        self.n_wires = n_wires
+        self.dim = 2 ** n_wires
+        self.indices = np.unique(np.asarray(indices, dtype=np.int64))
+        if self.indices.size and (self.indices[0] < 0 or self.indices[-1] >= self.dim):
+            raise ValueError(f"marked elements must be between 0 and {self.dim - 1}")
+
+    def apply(self, state, power=1):
+        """Applies the operator `power` times.
+
+        Args:
+            - state (np.ndarray): state of shape (..., 2^n); leading axes are a batch
+            - power (int): number of applications
+
+        Returns:
+            - (np.ndarray): new array with the evolved state
+        """
+
+        state = np.array(state)
+        for _ in range(power):
+            state[..., self.indices] *= -1
+            mean = state.mean(axis=-1, keepdims=True)
+            state *= -1
+            state += 2 * mean
+        return state
+
+    def matrix(self):
+        """Dense matrix of the operator, for checks on small search spaces."""
+
+        return self.apply(np.eye(self.dim)).T
+
+    def uniform_state(self):
+        """The uniform superposition |s> the counting algorithm starts from."""
+
+        return np.full(self.dim, 2 ** (-self.n_wires / 2))
+
+
+def phase_estimation_probs(operator, n_estimation, state=None):
+    """Output distribution of quantum phase estimation of `operator` on `state`.
+
+    Args:
+        - operator: object with an `apply(state)` method, e.g. a `GroverOperator`
+        - n_estimation (int): number of estimation wires t
+        - state (np.ndarray): target state, by default `operator.uniform_state()`
+
+    Returns:
+        - (np.ndarray): probabilities of the 2^t outcomes, in the order of `qml.probs` on the
+        estimation wires
+    """
+
+    state = operator.uniform_state() if state is None else np.asarray(state)
+    n = 2 ** n_estimation
+    overlaps = np.empty(n, dtype=complex)
+    evolved = state
+    for m in range(n):
+        if m:
+            evolved = operator.apply(evolved)
+        overlaps[m] = np.vdot(state, evolved)
+
+    # sum over k, l of w^(-j(k - l)) a_(k - l): the difference m = k - l occurs N - |m| times and
+    # a_(-m) is the complex conjugate of a_m
+    weighted = (n - np.arange(n)) * overlaps
+    probs = (2 * np.fft.fft(weighted).real - n * overlaps[0].real) / n ** 2
+    return np.clip(probs, 0, None)
+
+
+def grover_angle(n_marked, n_wires):
+    """Rotation angle theta of the Grover operator, sin^2(theta / 2) = M / 2^n.
+
+    Args:
+        - n_marked (int or np.ndarray): number of marked elements M
+        - n_wires (int): number of qubits of the search space
+
+    Returns:
+        - (float or np.ndarray): theta, between 0 and pi
+    """
+
+    return 2 * np.arcsin(np.sqrt(np.asarray(n_marked) / 2 ** n_wires))
+
+
+def spectral_probs(n_marked, n_wires, n_estimation):
+    """Output distribution of quantum counting computed from the two eigenphases +-theta.
+
+    Each eigenphase contributes the Fejer kernel sin^2(N d / 2) / (N^2 sin^2(d / 2)), where
+    d = theta - 2 pi j / N is its distance from outcome j and N = 2^t.
+
+    Args:
+        - n_marked (int or np.ndarray): number of marked elements M, any shape
+        - n_wires (int): number of qubits of the search space
+        - n_estimation (int): number of estimation wires t
+
+    Returns:
+        - (np.ndarray): probabilities of shape n_marked.shape + (2^t,)
+    """
+
+    n = 2 ** n_estimation
+    theta = grover_angle(n_marked, n_wires)[..., None]
+    outcomes = 2 * np.pi * np.arange(n) / n
+    probs = 0
+    for phase in (theta, -theta):
+        half = (phase - outcomes) / 2
+        denominator = np.sin(half)
+        exact = np.isclose(denominator, 0)
+        kernel = np.sin(n * half) ** 2 / np.where(exact, 1, n ** 2 * denominator ** 2)
+        probs = probs + np.where(exact, 1, kernel) / 2
+    return probs
+
+
+def estimate_count(probs, n_wires):
+    """Number of marked elements estimated from the most likely phase estimation outcome.
+
+    Args:
+        - probs (np.ndarray): distribution of the estimation register, or an array of
+          distributions along the last axis
+        - n_wires (int): number of qubits of the search space
+
+    Returns:
+        - (float or np.ndarray): 2^n sin^2(theta / 2) with theta = 2 pi j / 2^t
+    """
+
+    probs = np.asarray(probs)
+    # the peaks at +theta and -theta are equal up to rounding; take the first one
+    index = np.argmax(np.isclose(probs, probs.max(axis=-1, keepdims=True)), axis=-1)
+    theta = 2 * np.pi * index / probs.shape[-1]
+    counts = 2 ** n_wires * np.sin(theta / 2) ** 2
+    return float(counts) if counts.ndim == 0 else counts
@@ -0,0 +1,122 @@
+"""Parallel grading of the challenge directories on a process pool.
+
+Each challenge is graded by one worker process (which imports the solution once, see
+`qhack.runner`). Challenges are submitted slowest-first according to their `expected_seconds`
+so the long optimisation/training challenges do not end up at the tail of the run, and every
+case is aborted once it exceeds the time limit of its problem.
+
+Usage:
+    python -m qhack.parallel -j 4 --report results.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from qhack.challenges import CHALLENGES, resolve
+from qhack.runner import grade_challenge, print_reports
+
+
+def schedule(names):
+    """Orders challenges longest-expected-first.
+
+    Args:
+        - names (list(str)): challenge directories
+
+    Returns:
+        - (list(str)): the same challenges, slowest first
+    """
+
+    return sorted(names, key=lambda name: CHALLENGES[name]["expected_seconds"], reverse=True)
+
+
+def iter_grade_parallel(names=None, max_workers=None, enforce_time_limits=True):
+    """Grades challenges on a process pool, yielding their reports as they complete.
+
+    Args:
+        - names (list(str)): challenge directories or prefixes; None grades all 25 challenges
+        - max_workers (int): size of the process pool (defaults to the number of CPUs)
+        - enforce_time_limits (bool): abort cases that exceed the time limit of the problem
+
+    Yields:
+        - (str, list(dict)): challenge name and its case reports, see `qhack.runner.run_case`
+    """
+
+    names = schedule(resolve(names))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(grade_challenge, name, enforce_time_limits): name for name in names}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def grade_parallel(names=None, max_workers=None, enforce_time_limits=True):
+    """Grades challenges on a process pool.
+
+    Args:
+        - names (list(str)): challenge directories or prefixes; None grades all 25 challenges
+        - max_workers (int): size of the process pool (defaults to the number of CPUs)
+        - enforce_time_limits (bool): abort cases that exceed the time limit of the problem
+
+    Returns:
+        - (list(dict)): one report per test case, in registry order
+    """
+
+    by_name = dict(iter_grade_parallel(names, max_workers, enforce_time_limits))
+    return [r for name in CHALLENGES if name in by_name for r in by_name[name]]
+
+
+def build_report(reports, wall_seconds, max_workers):
+    """Builds the machine-readable summary written by `--report`.
+
+    Args:
+        - reports (list(dict)): case reports
+        - wall_seconds (float): elapsed time of the whole run
+        - max_workers (int): size of the process pool
+
+    Returns:
+        - (dict): {"summary": {...}, "cases": reports}
+    """
+
+    return {
+        "summary": {
+            "cases": len(reports),
+            "passed": sum(r["passed"] for r in reports),
+            "failed": sum(not r["passed"] for r in reports),
+            "timed_out": sum(r["timed_out"] for r in reports),
+            "case_seconds": sum(r["seconds"] for r in reports),
+            "wall_seconds": wall_seconds,
+            "workers": max_workers or os.cpu_count(),
+        },
+        "cases": reports,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenges", nargs="*", help="challenge directories or prefixes")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--report", help="write a JSON report to this path ('-' for stdout)")
+    parser.add_argument("--no-time-limits", action="store_true", help="do not abort slow cases")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    reports = grade_parallel(args.challenges, args.workers, not args.no_time_limits)
+    wall_seconds = time.perf_counter() - start
+
+    if args.report == "-":
+        json.dump(build_report(reports, wall_seconds, args.workers), sys.stdout, indent=2)
+        print()
+    else:
+        print_reports(reports)
+        print(f"wall time {wall_seconds:.2f}s")
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(build_report(reports, wall_seconds, args.workers), f, indent=2)
+    return 0 if all(r["passed"] for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""Pauli words in the binary symplectic representation, packed into 64-bit masks.
+
+A Pauli word on n qubits is stored as two bit masks, x and z, with (x, z) = (0, 0) for I, (1, 0)
+for X, (1, 1) for Y and (0, 1) for Z on each qubit. Many words are stored as two uint64 arrays of
+shape (words, ceil(n / 64)), qubit q being bit q % 64 of column q // 64.
+
+Two words can be measured with a single circuit (the rules of the optimizing-measurements
+challenge) when, on every qubit, one of them is the identity or both are equal. With masks, the
+qubits where both act are `(x1 | z1) & (x2 | z2)`, and the words are compatible when they agree
+there: `((x1 ^ x2) | (z1 ^ z2))` must vanish on those qubits. Joining two compatible words is a
+bitwise OR of their masks.
+
+Words that are pairwise compatible can all be measured together, so grouping the terms of a
+Hamiltonian is colouring its conflict graph (one vertex per word, an edge between incompatible
+words). `conflict_matrix` builds that graph in blocks of rows with NumPy, and `group` colours it
+with one of `STRATEGIES`:
+
+- "greedy": the challenge's first-fit in input order, on a letter index of the groups and without
+  the matrix (10^5 words on 120 qubits in about 20 s);
+- "largest-first": first-fit with the words of most conflicts first;
+- "dsatur": next the word that conflicts with the most groups, then with the most words;
+- "rlf": recursive largest first, building one maximal group at a time from the word with the
+  most conflicts left, adding the candidates that conflict most with the words already excluded.
+
+Better colourings cost more: the matrix takes O(N^2) bytes, and RLF O(N^2) time per group.
+
+    python -m qhack.paulis --terms 2000 --qubits 12
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+_LETTERS = np.array(list("IXZY"))
+
+
+def pack(words):
+    """Packs Pauli words given as lists (or strings) of "I", "X", "Y" and "Z".
+
+    Args:
+        - words (list(list(str))): Pauli words, all on the same number of qubits
+
+    Returns:
+        - (np.ndarray, np.ndarray, int): x and z masks of shape (len(words), ceil(n / 64)), and n
+    """
+
+    n = len(words[0]) if len(words) else 0
+    text = "".join("".join(word) for word in words)
+    if len(text) != n * len(words):
+        raise ValueError("all Pauli words must act on the same number of qubits")
+    letters = np.frombuffer(text.encode(), dtype=np.uint8).reshape(len(words), n)
+    if not np.isin(letters, np.frombuffer(b"IXYZ", dtype=np.uint8)).all():
+        raise ValueError("Pauli words may only contain I, X, Y and Z")
+
+    x = _pack_bits((letters == ord("X")) | (letters == ord("Y")))
+    z = _pack_bits((letters == ord("Z")) | (letters == ord("Y")))
+    return x, z, n
+
+
+def _pack_bits(bits):
+    """Packs a bool array of shape (words, n) into uint64 masks of shape (words, ceil(n / 64))."""
+
+    n_columns = max(-(-bits.shape[1] // 64), 1)
+    padded = np.zeros((bits.shape[0], 64 * n_columns), dtype=bool)
+    padded[:, : bits.shape[1]] = bits
+    return np.packbits(padded, axis=-1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def _unpack_bits(masks, n):
+    """Bits of uint64 masks of shape (words, columns), as a uint8 array of shape (words, n)."""
+
+    raw = np.ascontiguousarray(np.atleast_2d(masks).astype("<u8")).view(np.uint8)
+    return np.unpackbits(raw, axis=-1, bitorder="little")[:, :n]
+
+
+def unpack(x, z, n):
+    """Pauli words of packed masks.
+
+    Args:
+        - x (np.ndarray): X masks of shape (words, columns)
+        - z (np.ndarray): Z masks of the same shape
+        - n (int): number of qubits
+
+    Returns:
+        - (list(list(str))): the Pauli words
+    """
+
+    return _LETTERS[_codes(x, z, n)].tolist()
+
+
+def _codes(x, z, n):
+    """Letter codes 0 (I), 1 (X), 2 (Z) and 3 (Y) of packed words, shape (words, n)."""
+
+    return _unpack_bits(x, n) + 2 * _unpack_bits(z, n)
+
+
+def compatible(x1, z1, x2, z2):
+    """Whether words can be measured together, broadcasting over the leading axes.
+
+    Args:
+        - x1, z1 (np.ndarray): masks of shape (..., columns)
+        - x2, z2 (np.ndarray): masks broadcastable against them
+
+    Returns:
+        - (np.ndarray): bool array of the broadcast leading shape
+    """
+
+    clash = (x1 | z1) & (x2 | z2) & ((x1 ^ x2) | (z1 ^ z2))
+    return ~np.any(clash, axis=-1)
+
+
+def first_fit_groups(x, z):
+    """Groups words in order, each one joining the first compatible group or starting a new one.
+
+    This is the greedy of the challenge's `optimize_measurements`. Instead of comparing every word
+    with the mask of every group, the groups are indexed by letter: one bit set over the groups per
+    (qubit, letter) pair marks the groups acting on that qubit with another letter. The groups
+    that conflict with a word are the OR of the bit sets of its non-identity factors, so a word
+    costs one gather of |support| rows of (groups / 64) integers. The first groups are searched
+    first, and the search widens geometrically until a compatible group is found.
+
+    10^5 random words on 120 qubits, which almost never share a group, take about 20 s.
+
+    Args:
+        - x, z (np.ndarray): masks of the words, shape (words, columns)
+
+    Returns:
+        - (np.ndarray, np.ndarray): masks of the joined groups, shape (groups, columns)
+    """
+
+    n = 64 * x.shape[1]
+    codes = _codes(x, z, n)
+    # blocked[4 q + c] bit g: group g acts on qubit q with a letter other than c (and not I)
+    blocked = np.zeros((4 * n, max(-(-len(x) // 64), 1)), dtype=np.uint64)
+    group_codes = np.zeros((len(x), n), dtype=np.uint8)
+    count = 0
+    for word in codes:
+        support = np.flatnonzero(word)
+        rows = 4 * support + word[support]
+        target = count
+        used = -(-count // 64)
+        start, width = 0, 4
+        while start < used:
+            stop = min(start + width, used)
+            free = ~np.bitwise_or.reduce(blocked[rows, start:stop], axis=0)
+            if stop == used and count % 64:
+                free[-1] &= np.uint64((1 << (count % 64)) - 1)
+            hits = np.flatnonzero(free)
+            if hits.size:
+                lowest = int(free[hits[0]])
+                target = 64 * (start + int(hits[0])) + (lowest & -lowest).bit_length() - 1
+                break
+            start, width = stop, 2 * width
+
+        count = max(count, target + 1)
+        new = support[group_codes[target, support] == 0]
+        if not new.size:
+            continue
+        letters = word[new]
+        group_codes[target, new] = letters
+        bit = np.uint64(1 << (target % 64))
+        for letter in (1, 2, 3):
+            blocked[4 * new[letters != letter] + letter, target // 64] |= bit
+
+    group_codes = group_codes[:count]
+    return _pack_bits(group_codes & 1 == 1), _pack_bits(group_codes >> 1 == 1)
+
+
+def conflict_matrix(x, z, block=1024):
+    """Which pairs of words cannot be measured together.
+
+    Args:
+        - x, z (np.ndarray): masks of the words, shape (words, columns)
+        - block (int): number of rows computed at once
+
+    Returns:
+        - (np.ndarray): symmetric bool matrix of shape (words, words), False on the diagonal
+    """
+
+    conflicts = np.empty((len(x), len(x)), dtype=bool)
+    for start in range(0, len(x), block):
+        stop = min(start + block, len(x))
+        conflicts[start:stop] = ~compatible(x[start:stop, None], z[start:stop, None], x, z)
+    return conflicts
+
+
+def _first_free(taken):
+    """Smallest colour not in the bool array `taken`."""
+
+    free = np.flatnonzero(~taken)
+    return int(free[0]) if free.size else len(taken)
+
+
+def _largest_first(conflicts):
+    """Colours of the words, coloured first-fit by decreasing number of conflicts."""
+
+    colours = np.full(len(conflicts), -1)
+    for v in np.argsort(-conflicts.sum(axis=1), kind="stable"):
+        neighbours = colours[conflicts[v]]
+        taken = np.bincount(neighbours[neighbours >= 0], minlength=1).astype(bool)
+        colours[v] = _first_free(taken)
+    return colours
+
+
+def _dsatur(conflicts):
+    """Colours of the words, the next word being the one whose neighbours use the most colours."""
+
+    n = len(conflicts)
+    degrees = conflicts.sum(axis=1)
+    colours = np.full(n, -1)
+    # seen[v, c]: v has a neighbour of colour c; grown when a new colour is opened
+    seen = np.zeros((n, 16), dtype=bool)
+    saturation = np.zeros(n, dtype=np.int64)
+    priority = degrees.astype(np.int64)
+    for _ in range(n):
+        v = int(np.argmax(priority))
+        colour = _first_free(seen[v])
+        if colour == seen.shape[1]:
+            seen = np.concatenate([seen, np.zeros_like(seen)], axis=1)
+        colours[v] = colour
+        priority[v] = -1
+        reached = conflicts[v] & ~seen[:, colour] & (colours < 0)
+        saturation[reached] += 1
+        priority[reached] = saturation[reached] * (n + 1) + degrees[reached]
+        seen[:, colour] |= conflicts[v]
+    return colours
+
+
+def _recursive_largest_first(conflicts):
+    """Colours of the words, each colour class grown to a maximal set before the next one."""
+
+    n = len(conflicts)
+    colours = np.full(n, -1)
+    uncoloured = np.ones(n, dtype=bool)
+    # conflicts of every word with the uncoloured words
+    degrees = conflicts.sum(axis=0).astype(np.int64)
+    colour = 0
+    while uncoloured.any():
+        candidates = uncoloured.copy()
+        excluded = np.zeros(n, dtype=bool)
+        # conflicts of every word with the excluded words
+        blocked = np.zeros(n, dtype=np.int64)
+        v = int(np.argmax(np.where(uncoloured, degrees, -1)))
+        while True:
+            colours[v] = colour
+            candidates[v] = uncoloured[v] = False
+            newly = conflicts[v] & candidates
+            candidates &= ~newly
+            excluded |= newly
+            blocked += conflicts[newly].sum(axis=0)
+            if not candidates.any():
+                break
+            # most conflicts with the excluded words, then fewest with the remaining candidates
+            score = blocked * (n + 1) - (degrees - blocked)
+            v = int(np.argmax(np.where(candidates, score, np.iinfo(np.int64).min)))
+        degrees -= conflicts[colours == colour].sum(axis=0)
+        colour += 1
+    return colours
+
+
+STRATEGIES = {
+    "greedy": None,
+    "largest-first": _largest_first,
+    "dsatur": _dsatur,
+    "rlf": _recursive_largest_first,
+}
+
+GroupingReport = namedtuple("GroupingReport", ["strategy", "groups", "compression_ratio", "seconds"])
+
+
+def colour_groups(x, z, strategy="greedy"):
+    """Groups words with a colouring strategy.
+
+    Args:
+        - x, z (np.ndarray): masks of the words, shape (words, columns)
+        - strategy (str): one of `STRATEGIES`
+
+    Returns:
+        - (np.ndarray, np.ndarray): masks of the joined groups, shape (groups, columns)
+
+    Raises:
+        - ValueError: for an unknown strategy
+    """
+
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}, expected one of {sorted(STRATEGIES)}")
+    if STRATEGIES[strategy] is None or not len(x):
+        return first_fit_groups(x, z)
+    colours = STRATEGIES[strategy](conflict_matrix(x, z))
+    order = np.argsort(colours, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(colours[order]) > 0])
+    return np.bitwise_or.reduceat(x[order], starts), np.bitwise_or.reduceat(z[order], starts)
+
+
+def group(words, strategy="greedy"):
+    """Groups Pauli words and times it.
+
+    Args:
+        - words (list(list(str))): Pauli words, all on the same number of qubits
+        - strategy (str): one of `STRATEGIES`
+
+    Returns:
+        - (GroupingReport): the joined words to measure, 1 - groups / words, and the time taken
+    """
+
+    start = time.perf_counter()
+    x, z, n = pack(words)
+    groups = unpack(*colour_groups(x, z, strategy), n)
+    seconds = time.perf_counter() - start
+    return GroupingReport(strategy, groups, 1 - len(groups) / len(words), seconds)
+
+
+def random_words(n_terms, n_qubits, seed=0):
+    """Random Pauli words, each factor being the identity with probability 1/2."""
+
+    rng = np.random.default_rng(seed)
+    return rng.choice(list("IIIXYZ"), size=(n_terms, n_qubits)).tolist()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=2000, help="number of random Pauli words")
+    parser.add_argument("--qubits", type=int, default=12, help="number of qubits")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random words")
+    args = parser.parse_args(argv)
+
+    words = random_words(args.terms, args.qubits, args.seed)
+    for strategy in args.strategies:
+        report = group(words, strategy)
+        print(
+            f"{strategy:>13}: {len(report.groups)} groups, compression ratio "
+            f"{report.compression_ratio:.4f} in {report.seconds:.2f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
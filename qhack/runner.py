@@ -0,0 +1,303 @@
+"""Warm-process grading of the challenge solutions.
+
+Every solution script is imported once; its `if __name__ == "__main__":` block is compiled
+separately and executed in-process for each `#.in` file, with `stdin`/`stdout` redirected.
+PennyLane and any module-level devices are therefore built once per script instead of once
+per test case.
+
+Usage:
+    python -m qhack.runner                      # every challenge
+    python -m qhack.runner games_200 qml_500    # selected challenges (prefixes work)
+"""
+
+import argparse
+import ast
+import contextlib
+import importlib.util
+import io
+import os
+import signal
+import sys
+import time
+import traceback
+
+from qhack.challenges import CHALLENGES, ROOT, list_cases, resolve, script_path
+
+_LOADED = {}
+
+
+class CaseTimeout(Exception):
+    """Raised inside a test case that runs past its time limit."""
+
+
+@contextlib.contextmanager
+def _deadline(seconds):
+    """Raises `CaseTimeout` if the body runs longer than `seconds`.
+
+    Relies on `SIGALRM`, so the limit is only enforced on POSIX systems and in the main thread.
+    """
+
+    if not seconds or not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def handler(signum, frame):
+        raise CaseTimeout(f"exceeded the {seconds}s time limit")
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _main_block(tree):
+    """Returns the body of the top-level `if __name__ == "__main__":` statement of a parsed script."""
+
+    for node in tree.body:
+        if (
+            isinstance(node, ast.If)
+            and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name)
+            and node.test.left.id == "__name__"
+            and len(node.test.comparators) == 1
+            and ast.literal_eval(node.test.comparators[0]) == "__main__"
+        ):
+            return node.body
+    return None
+
+
+def load_challenge(name):
+    """Imports a challenge script (once per process) and compiles its `__main__` block.
+
+    Args:
+        - name (str): challenge directory
+
+    Returns:
+        - (module): the imported solution module
+        - (code): the compiled body of its `__main__` block
+    """
+
+    if name in _LOADED:
+        return _LOADED[name]
+
+    # the solutions import `qhack`, so the repository root must be importable wherever the
+    # runner was started from
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    path = script_path(name)
+    with open(path) as f:
+        source = f.read()
+
+    body = _main_block(ast.parse(source, path))
+    if body is None:
+        raise ValueError(f"{path} has no `if __name__ == \"__main__\":` block")
+    main_code = compile(ast.Module(body=body, type_ignores=[]), path, "exec")
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+
+    _LOADED[name] = (module, main_code)
+    return _LOADED[name]
+
+
+def run_main(name, stdin_text):
+    """Runs the `__main__` block of a challenge on the given input, inside the current process.
+
+    Args:
+        - name (str): challenge directory
+        - stdin_text (str): contents fed to `sys.stdin`
+
+    Returns:
+        - (str): everything the block printed to `stdout`
+    """
+
+    module, main_code = load_challenge(name)
+    namespace = dict(vars(module))
+    namespace["__name__"] = "__main__"
+
+    stdout = io.StringIO()
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin_text)
+    try:
+        with contextlib.redirect_stdout(stdout):
+            exec(main_code, namespace)
+    finally:
+        sys.stdin = saved_stdin
+    return stdout.getvalue()
+
+
+def _to_float(token):
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def _same_number(a, b):
+    a, b = _to_float(a), _to_float(b)
+    return a is not None and a == b
+
+
+def compare_output(output, expected, tolerance=None, compare="exact"):
+    """Checks a solution's output against the contents of a `#.ans` file.
+
+    Outputs are compared token by token (comma separated). Numeric tokens must agree within the
+    relative `tolerance` (absolute for answers smaller than 1 in magnitude); with no tolerance they
+    must be equal as strings or as floats. In "accuracy" mode the fraction of equal tokens must
+    be at least `tolerance`.
+
+    Args:
+        - output (str): what the solution printed
+        - expected (str): contents of the `#.ans` file
+        - tolerance (float): tolerance from the problem statement, or None
+        - compare (str): "exact", "numeric" or "accuracy"
+
+    Returns:
+        - (bool): whether the output is accepted
+    """
+
+    got = [t.strip() for t in output.strip().split(",")]
+    want = [t.strip() for t in expected.strip().split(",")]
+    if len(got) != len(want):
+        return False
+
+    if compare == "accuracy":
+        matches = sum(1 for g, w in zip(got, want) if g == w or _same_number(g, w))
+        return matches / len(want) >= tolerance
+
+    for g, w in zip(got, want):
+        if g == w or _same_number(g, w):
+            continue
+        g_value, w_value = _to_float(g), _to_float(w)
+        if tolerance is None or compare == "exact" or g_value is None or w_value is None:
+            return False
+        if abs(g_value - w_value) > tolerance * max(abs(w_value), 1.0):
+            return False
+    return True
+
+
+def _report(name, in_path, passed=False, output="", expected="", seconds=0.0, error=None, timed_out=False):
+    return {
+        "challenge": name,
+        "case": os.path.basename(in_path),
+        "passed": passed,
+        "output": output,
+        "expected": expected,
+        "seconds": seconds,
+        "error": error,
+        "timed_out": timed_out,
+    }
+
+
+def run_case(name, in_path, ans_path, time_limit=None):
+    """Runs and grades one test case of a challenge.
+
+    Args:
+        - name (str): challenge directory
+        - in_path (str): path of the `#.in` file
+        - ans_path (str): path of the `#.ans` file
+        - time_limit (float): seconds after which the case is aborted and failed; None disables it
+
+    Returns:
+        - (dict): case report with keys "challenge", "case", "passed", "output", "expected",
+        "seconds", "error" and "timed_out"
+    """
+
+    spec = CHALLENGES[name]
+    with open(in_path) as f:
+        stdin_text = f.read()
+    with open(ans_path) as f:
+        expected = f.read().strip()
+
+    output, error, timed_out = "", None, False
+    start = time.perf_counter()
+    try:
+        with _deadline(time_limit):
+            output = run_main(name, stdin_text).strip()
+    except CaseTimeout as e:
+        error, timed_out = f"CaseTimeout: {e}", True
+    except Exception:
+        error = traceback.format_exc(limit=-3)
+    seconds = time.perf_counter() - start
+
+    passed = error is None and compare_output(output, expected, spec["tolerance"], spec["compare"])
+    return _report(name, in_path, passed, output, expected, seconds, error, timed_out)
+
+
+def grade_challenge(name, enforce_time_limits=False):
+    """Grades every shipped test case of one challenge in the current process.
+
+    Args:
+        - name (str): challenge directory
+        - enforce_time_limits (bool): abort cases that exceed the time limit of the problem
+
+    Returns:
+        - (list(dict)): one report per test case, see `run_case`
+    """
+
+    try:
+        load_challenge(name)
+    except Exception:
+        error = traceback.format_exc(limit=-3)
+        return [_report(name, in_path, error=error) for in_path, _ in list_cases(name)]
+
+    time_limit = CHALLENGES[name]["time_limit"] if enforce_time_limits else None
+    return [run_case(name, in_path, ans_path, time_limit) for in_path, ans_path in list_cases(name)]
+
+
+def grade(names=None, enforce_time_limits=False):
+    """Grades every shipped test case of the selected challenges in the current process.
+
+    Args:
+        - names (list(str)): challenge directories or prefixes; None grades all 25 challenges
+        - enforce_time_limits (bool): abort cases that exceed the time limit of the problem
+
+    Returns:
+        - (list(dict)): one report per test case, see `run_case`
+    """
+
+    reports = []
+    for name in resolve(names):
+        reports.extend(grade_challenge(name, enforce_time_limits))
+    return reports
+
+
+def print_reports(reports, stream=None):
+    """Writes one line per case report and a final summary line."""
+
+    stream = stream or sys.stdout
+    for r in reports:
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"{status} {r['challenge']}/{r['case']} {r['seconds']:.2f}s", file=stream)
+        if not r["passed"]:
+            if r["error"]:
+                print("    " + r["error"].strip().replace("\n", "\n    "), file=stream)
+            else:
+                print(f"    got:      {r['output'][:200]}", file=stream)
+                print(f"    expected: {r['expected'][:200]}", file=stream)
+    passed = sum(r["passed"] for r in reports)
+    total = sum(r["seconds"] for r in reports)
+    print(f"{passed}/{len(reports)} cases passed in {total:.2f}s", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenges", nargs="*", help="challenge directories or prefixes")
+    parser.add_argument(
+        "--time-limits", action="store_true", help="fail cases that exceed the problem's time limit"
+    )
+    args = parser.parse_args(argv)
+
+    reports = grade(args.challenges, args.time_limits)
+    print_reports(reports)
+    return 0 if all(r["passed"] for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""Stabilizer-tableau simulator for Clifford circuits.
+
+The Deutsch–Jozsa, find-the-car and switches oracles only use H, X, Z and CNOT gates, so their
+circuits stay in the Clifford group and can be simulated with the tableau of Aaronson and
+Gottesman (CHP) in O(n^2) memory and O(n) time per gate instead of a 2^n statevector. This makes
+the same phase-oracle logic usable with thousands of input qubits, see `deutsch_jozsa` and
+`bernstein_vazirani`.
+
+`StabilizerDevice` executes tapes recorded with `qhack.statevector` (it is returned by
+`qhack.statevector.device` for the name "default.clifford", or for every device when
+`QHACK_BACKEND=stabilizer`). Circuits with a non-Clifford gate, such as the Toffoli of the
+find-the-car oracle, or with measurements other than computational-basis samples fall back to
+the statevector simulator as long as they have at most `MAX_FALLBACK_WIRES` wires.
+
+Usage:
+    python -m qhack.stabilizer --inputs 2000    # time a Bernstein-Vazirani instance
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from qhack import statevector
+
+MAX_FALLBACK_WIRES = 20
+
+
+def _g(x1, z1, x2, z2):
+    """Exponent of i picked up by the product of the single-qubit Paulis (x1, z1) and (x2, z2)."""
+
+    x1, z1, x2, z2 = (np.asarray(a, dtype=np.int8) for a in (x1, z1, x2, z2))
+    return np.where(
+        x1 & z1,
+        z2 - x2,
+        np.where(x1 == 1, z2 * (2 * x2 - 1), np.where(z1 == 1, x2 * (1 - 2 * z2), 0)),
+    )
+
+
+class Tableau:
+    """Destabilizer/stabilizer tableau of an n-qubit state, initialised to |0...0>.
+
+    Generators 0..n-1 are the destabilizers and n..2n-1 the stabilizers. The bits are stored
+    qubit-major (`x[q, i]` is the X bit of generator i on qubit q) so that gates, which touch one
+    or two qubits of every generator, work on contiguous rows.
+
+    Args:
+        - n (int): number of qubits
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.x = np.zeros((n, 2 * n), dtype=bool)
+        self.z = np.zeros((n, 2 * n), dtype=bool)
+        self.r = np.zeros(2 * n, dtype=bool)
+        idx = np.arange(n)
+        self.x[idx, idx] = True
+        self.z[idx, idx + n] = True
+
+    def copy(self):
+        other = Tableau.__new__(Tableau)
+        other.n = self.n
+        other.x, other.z, other.r = self.x.copy(), self.z.copy(), self.r.copy()
+        return other
+
+    def h(self, a):
+        self.r ^= self.x[a] & self.z[a]
+        self.x[a], self.z[a] = self.z[a].copy(), self.x[a].copy()
+
+    def s(self, a):
+        self.r ^= self.x[a] & self.z[a]
+        self.z[a] ^= self.x[a]
+
+    def sdg(self, a):
+        self.r ^= self.x[a] & ~self.z[a]
+        self.z[a] ^= self.x[a]
+
+    def px(self, a):
+        self.r ^= self.z[a]
+
+    def py(self, a):
+        self.r ^= self.x[a] ^ self.z[a]
+
+    def pz(self, a):
+        self.r ^= self.x[a]
+
+    def cnot(self, a, b):
+        self.r ^= self.x[a] & self.z[b] & ~(self.x[b] ^ self.z[a])
+        self.x[b] ^= self.x[a]
+        self.z[a] ^= self.z[b]
+
+    def cz(self, a, b):
+        self.h(b)
+        self.cnot(a, b)
+        self.h(b)
+
+    def swap(self, a, b):
+        self.x[[a, b]] = self.x[[b, a]]
+        self.z[[a, b]] = self.z[[b, a]]
+
+    def measure(self, q, rng):
+        """Measures qubit `q` in the computational basis, collapsing the state.
+
+        Args:
+            - q (int): qubit index
+            - rng (np.random.Generator): source of the outcome of random measurements
+
+        Returns:
+            - (int): 0 or 1
+        """
+
+        n = self.n
+        anticommuting = np.flatnonzero(self.x[q, n:])
+
+        if anticommuting.size:
+            # random outcome: every other generator with an X on q is multiplied by stabilizer p
+            p = anticommuting[0] + n
+            rows = np.flatnonzero(self.x[q])
+            rows = rows[rows != p]
+            xp, zp = self.x[:, p : p + 1], self.z[:, p : p + 1]
+            phase = _g(xp, zp, self.x[:, rows], self.z[:, rows]).sum(axis=0, dtype=np.int64)
+            self.r[rows] = np.mod(2 * self.r[p] + 2 * self.r[rows] + phase, 4) // 2
+            self.x[:, rows] ^= xp
+            self.z[:, rows] ^= zp
+
+            self.x[:, p - n], self.z[:, p - n], self.r[p - n] = self.x[:, p], self.z[:, p], self.r[p]
+            self.x[:, p] = False
+            self.z[:, p] = False
+            self.z[q, p] = True
+            self.r[p] = rng.integers(2)
+            return int(self.r[p])
+
+        # deterministic outcome: Z_q is the product of the stabilizers whose destabilizer has an
+        # X on q; all of them commute, so the phase of the product follows from prefix XORs
+        rows = np.flatnonzero(self.x[q, :n]) + n
+        xs, zs = self.x[:, rows], self.z[:, rows]
+        acc_x = np.bitwise_xor.accumulate(xs, axis=1)[:, :-1]
+        acc_z = np.bitwise_xor.accumulate(zs, axis=1)[:, :-1]
+        phase = _g(acc_x, acc_z, xs[:, 1:], zs[:, 1:]).sum(dtype=np.int64)
+        return int(np.mod(2 * np.sum(self.r[rows], dtype=np.int64) + phase, 4) // 2)
+
+
+# single-qubit and two-qubit Clifford gates as sequences of tableau updates
+_GATES = {
+    "Identity": [],
+    "Hadamard": ["h"],
+    "PauliX": ["px"],
+    "PauliY": ["py"],
+    "PauliZ": ["pz"],
+    "S": ["s"],
+    "S.inv": ["sdg"],
+    "CNOT": ["cnot"],
+    "CZ": ["cz"],
+    "SWAP": ["swap"],
+}
+
+
+def is_clifford(operations):
+    """Whether every operation can be applied to a tableau.
+
+    Args:
+        - operations (list): operations with `name` and `wires` attributes
+
+    Returns:
+        - (bool)
+    """
+
+    return all(op.name in _GATES or op.name == "BasisState" for op in operations)
+
+
+class StabilizerDevice:
+    """Device that runs Clifford circuits on a `Tableau`.
+
+    Only computational-basis `sample` measurements are evaluated on the tableau; anything else is
+    delegated to `qhack.statevector.Device`.
+
+    Args:
+        - wires (int or list): number of wires or wire labels
+        - shots (int): number of samples
+        - seed (int): seed of the random number generator used for sampling
+    """
+
+    # fused single-qubit unitaries are not Clifford gates the tableau can apply
+    fuse_single_qubit = False
+
+    def __init__(self, wires, shots=None, seed=None, name="default.clifford"):
+        self.short_name = name
+        self.wires = list(range(wires)) if isinstance(wires, int) else list(wires)
+        self.num_wires = len(self.wires)
+        self.wire_map = {w: i for i, w in enumerate(self.wires)}
+        self.shots = shots
+        self.rng = np.random.default_rng(seed)
+        self._fallback = None
+
+    def fallback(self):
+        """The statevector device used for circuits the tableau cannot run."""
+
+        if self.num_wires > MAX_FALLBACK_WIRES:
+            raise ValueError(
+                f"circuit is not Clifford and {self.num_wires} wires are too many for the statevector fallback"
+            )
+        if self._fallback is None:
+            self._fallback = statevector.Device(self.wires, shots=self.shots, name=self.short_name)
+            self._fallback.rng = self.rng
+        return self._fallback
+
+    def apply(self, operations):
+        """Evolves |0...0> through `operations` and returns the tableau."""
+
+        tableau = Tableau(self.num_wires)
+        for op in operations:
+            axes = [self.wire_map[w] for w in op.wires]
+            if op.name == "BasisState":
+                for axis, bit in zip(axes, np.asarray(op.parameters[0]).reshape(-1)):
+                    if bit:
+                        tableau.px(axis)
+                continue
+            for method in _GATES[op.name]:
+                getattr(tableau, method)(*axes)
+        return tableau
+
+    def execute(self, operations, measurements):
+        supported = self.shots is not None and all(
+            m.return_type == "sample" and m.obs is None for m in measurements
+        )
+        if not (supported and is_clifford(operations)):
+            return self.fallback().execute(operations, measurements)
+
+        tableau = self.apply(operations)
+        results = []
+        # every shot measures a fresh copy of the final tableau; measurements of the same
+        # circuit share the shots, as on a statevector device
+        measured = sorted({w for m in measurements for w in (m.wires or self.wires)}, key=self.wire_map.__getitem__)
+        columns = {w: i for i, w in enumerate(measured)}
+        bits = np.zeros((self.shots, len(measured)), dtype=int)
+        for shot in range(self.shots):
+            state = tableau.copy() if shot < self.shots - 1 else tableau
+            for i, w in enumerate(measured):
+                bits[shot, i] = state.measure(self.wire_map[w], self.rng)
+        for m in measurements:
+            wires = m.wires or self.wires
+            results.append(np.squeeze(bits[:, [columns[w] for w in wires]]))
+        return results
+
+
+def _phase_oracle_bits(oracle, n_inputs, output_wire, seed):
+    """Runs H^n - oracle - H^n with the output wire in |->, returning one sample of the inputs."""
+
+    output_wire = n_inputs if output_wire is None else output_wire
+    inputs = list(range(n_inputs))
+    dev = StabilizerDevice(inputs + [output_wire], shots=1, seed=seed)
+
+    with statevector.QuantumTape() as tape:
+        statevector.PauliX(wires=output_wire)
+        statevector.Hadamard(wires=output_wire)
+        for i in inputs:
+            statevector.Hadamard(wires=i)
+        oracle()
+        for i in inputs:
+            statevector.Hadamard(wires=i)
+
+    return np.atleast_1d(dev.execute(tape.operations, [statevector.sample(wires=inputs)])[0])
+
+
+def deutsch_jozsa(oracle, n_inputs, output_wire=None, seed=None):
+    """Decides whether a Clifford oracle encodes a constant or a balanced function, with one shot.
+
+    Args:
+        - oracle (callable): queues `qhack.statevector` gates acting on the input wires
+          0..n_inputs-1 and on `output_wire`
+        - n_inputs (int): number of input wires
+        - output_wire: label of the output wire (defaults to `n_inputs`)
+        - seed (int): seed of the measurement
+
+    Returns:
+        - (str): "constant" or "balanced"
+    """
+
+    bits = _phase_oracle_bits(oracle, n_inputs, output_wire, seed)
+    return "balanced" if bits.any() else "constant"
+
+
+def bernstein_vazirani(oracle, n_inputs, output_wire=None, seed=None):
+    """Recovers the secret string s of an oracle computing f(x) = s.x (mod 2), with one shot.
+
+    This is the decoding of the switches challenge: the input wires that come out as 1 are the
+    switches connected to the light.
+
+    Args:
+        - oracle (callable): queues `qhack.statevector` gates acting on the input wires
+          0..n_inputs-1 and on `output_wire`
+        - n_inputs (int): number of input wires
+        - output_wire: label of the output wire (defaults to `n_inputs`)
+        - seed (int): seed of the measurement
+
+    Returns:
+        - (list(int)): indices of the input wires with s_i = 1
+    """
+
+    bits = _phase_oracle_bits(oracle, n_inputs, output_wire, seed)
+    return [int(i) for i in np.flatnonzero(bits)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inputs", type=int, default=1000, help="number of input qubits")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random secret string")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    secret = [int(i) for i in np.flatnonzero(rng.integers(2, size=args.inputs))]
+
+    def oracle():
+        for i in secret:
+            statevector.CNOT(wires=[i, args.inputs])
+
+    start = time.perf_counter()
+    found = bernstein_vazirani(oracle, args.inputs, seed=args.seed)
+    seconds = time.perf_counter() - start
+    print(f"{args.inputs} inputs, {len(secret)} CNOTs: {'ok' if found == secret else 'WRONG'} in {seconds:.2f}s")
+    return 0 if found == secret else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
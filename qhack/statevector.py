@@ -0,0 +1,774 @@
+"""Minimal pure-NumPy statevector simulator with a PennyLane-shaped interface.
+
+Importing PennyLane takes seconds, while most circuits in this repository act on one to eight
+qubits and are only executed forward. This module implements the subset of the PennyLane API
+those circuits use so a solution can run on plain NumPy by importing it in place of PennyLane:
+
+    from qhack import statevector as qml
+
+    dev = qml.device("default.qubit", wires=2)
+
+    @qml.qnode(dev)
+    def circuit(theta):
+        qml.RY(theta, wires=0)
+        qml.CNOT(wires=[0, 1])
+        return qml.probs(wires=[0, 1])
+
+The state is kept as a complex array with one axis of length two per wire (the first device wire
+is the most significant bit, as in PennyLane) and every gate is applied with a single
+`np.tensordot` on the axes of its wires. Gradients are not supported.
+
+Supported operations: Hadamard, PauliX/Y/Z (and the X/Y/Z aliases), Identity, S, T, RX, RY, RZ,
+PhaseShift, Rot, U3, CNOT, CZ, SWAP, Toffoli, CRY, SingleExcitation, DoubleExcitation,
+Excitation, QubitUnitary, ControlledQubitUnitary, MultiplexedRY, BasisState, QFT and the
+QuantumPhaseEstimation template.
+Supported measurements: probs, state, sample, expval and density_matrix.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from qhack.bits import index_to_bits
+
+# stack of operation lists of the tapes currently recording, innermost last
+_recording = []
+
+
+class tensor(np.ndarray):
+    """Result array that also provides the `numpy()` accessor of PennyLane tensors."""
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        return item if isinstance(item, np.ndarray) else np.asarray(item).view(tensor)
+
+    def numpy(self):
+        """Returns the plain array, or a Python scalar for zero-dimensional results."""
+
+        if self.ndim == 0:
+            return self.item()
+        return self.view(np.ndarray)
+
+
+def _as_tensor(value):
+    return np.asarray(value).view(tensor)
+
+
+def _queue(obj):
+    if _recording:
+        _recording[-1].append(obj)
+
+
+def _dequeue(obj):
+    """Removes an observable (or the factors of a product) from the innermost tape."""
+
+    if not _recording:
+        return
+    for factor in getattr(obj, "obs", [obj]):
+        ops = _recording[-1]
+        for i in range(len(ops) - 1, -1, -1):
+            if ops[i] is factor:
+                del ops[i]
+                break
+
+
+def _to_wires(wires):
+    if isinstance(wires, (list, tuple, range, np.ndarray)):
+        return list(wires)
+    return [wires]
+
+
+class Operation:
+    """Base class of gates and observables.
+
+    Subclasses set `num_params`, `num_wires` (None for any number of wires) and implement
+    `_matrix(*params)`. Operations created inside a quantum function are queued on the tape
+    that is recording.
+    """
+
+    num_params = 0
+    num_wires = 1
+
+    def __init__(self, *params, wires=None):
+        if wires is None and len(params) == self.num_params + 1:
+            params, wires = params[:-1], params[-1]
+        if wires is None:
+            raise ValueError(f"{type(self).__name__}: wires must be given")
+        if len(params) != self.num_params:
+            raise TypeError(f"{type(self).__name__} takes {self.num_params} parameters, got {len(params)}")
+
+        self.wires = _to_wires(wires)
+        if self.num_wires is not None and len(self.wires) != self.num_wires:
+            raise ValueError(f"{type(self).__name__} acts on {self.num_wires} wires, got {len(self.wires)}")
+        self.parameters = list(params)
+        self.inverse = False
+        _queue(self)
+
+    @property
+    def name(self):
+        return type(self).__name__ + (".inv" if self.inverse else "")
+
+    @property
+    def matrix(self):
+        """(np.ndarray): matrix of the operation on its wires, first wire most significant"""
+
+        m = self._matrix(*self.parameters)
+        return m.conj().T if self.inverse else m
+
+    def apply_to(self, state, axes):
+        """Applies the operation to the axes `axes` of a state of shape (2,) * n, possibly in place."""
+
+        return apply_matrix(state, self.matrix, axes)
+
+    def inv(self):
+        """Inverts the operation in place and returns it."""
+
+        self.inverse = not self.inverse
+        return self
+
+    @property
+    def eigvals(self):
+        return np.linalg.eigvalsh(self.matrix)
+
+    def __matmul__(self, other):
+        return TensorObservable(self, other)
+
+    def __repr__(self):
+        params = ", ".join(repr(p) for p in self.parameters)
+        sep = ", " if params else ""
+        return f"{self.name}({params}{sep}wires={self.wires})"
+
+
+class TensorObservable:
+    """Product of observables on disjoint wires, created with `@`."""
+
+    def __init__(self, *obs):
+        self.obs = []
+        for o in obs:
+            self.obs.extend(getattr(o, "obs", [o]))
+        self.wires = [w for o in self.obs for w in o.wires]
+        if len(set(self.wires)) != len(self.wires):
+            raise ValueError("the factors of a tensor observable must act on different wires")
+
+    @property
+    def name(self):
+        return [o.name for o in self.obs]
+
+    @property
+    def matrix(self):
+        m = np.ones((1, 1))
+        for o in self.obs:
+            m = np.kron(m, o.matrix)
+        return m
+
+    @property
+    def eigvals(self):
+        return np.linalg.eigvalsh(self.matrix)
+
+    def __matmul__(self, other):
+        return TensorObservable(self, other)
+
+    def __repr__(self):
+        return " @ ".join(repr(o) for o in self.obs)
+
+
+# ---------------------------------------------------------------------------------------------
+# gates
+# ---------------------------------------------------------------------------------------------
+
+_SQRT2 = np.sqrt(2)
+
+
+def _controlled(u):
+    """Matrix of `u` controlled on one extra (most significant) wire."""
+
+    n = u.shape[0]
+    m = np.eye(2 * n, dtype=complex)
+    m[n:, n:] = u
+    return m
+
+
+class Identity(Operation):
+    def _matrix(self):
+        return np.eye(2, dtype=complex)
+
+
+class Hadamard(Operation):
+    def _matrix(self):
+        return np.array([[1, 1], [1, -1]], dtype=complex) / _SQRT2
+
+
+class PauliX(Operation):
+    def _matrix(self):
+        return np.array([[0, 1], [1, 0]], dtype=complex)
+
+
+class PauliY(Operation):
+    def _matrix(self):
+        return np.array([[0, -1j], [1j, 0]])
+
+
+class PauliZ(Operation):
+    def _matrix(self):
+        return np.diag([1, -1]).astype(complex)
+
+
+X, Y, Z = PauliX, PauliY, PauliZ
+
+
+class S(Operation):
+    def _matrix(self):
+        return np.diag([1, 1j])
+
+
+class T(Operation):
+    def _matrix(self):
+        return np.diag([1, np.exp(1j * np.pi / 4)])
+
+
+class RX(Operation):
+    num_params = 1
+
+    def _matrix(self, theta):
+        c, s = np.cos(theta / 2), np.sin(theta / 2)
+        return np.array([[c, -1j * s], [-1j * s, c]])
+
+
+class RY(Operation):
+    num_params = 1
+
+    def _matrix(self, theta):
+        c, s = np.cos(theta / 2), np.sin(theta / 2)
+        return np.array([[c, -s], [s, c]], dtype=complex)
+
+
+class RZ(Operation):
+    num_params = 1
+
+    def _matrix(self, theta):
+        return np.diag([np.exp(-0.5j * theta), np.exp(0.5j * theta)])
+
+
+class PhaseShift(Operation):
+    num_params = 1
+
+    def _matrix(self, phi):
+        return np.diag([1, np.exp(1j * phi)])
+
+
+class Rot(Operation):
+    """RZ(omega) RY(theta) RZ(phi)"""
+
+    num_params = 3
+
+    def _matrix(self, phi, theta, omega):
+        c, s = np.cos(theta / 2), np.sin(theta / 2)
+        return np.array(
+            [
+                [np.exp(-0.5j * (phi + omega)) * c, -np.exp(0.5j * (phi - omega)) * s],
+                [np.exp(-0.5j * (phi - omega)) * s, np.exp(0.5j * (phi + omega)) * c],
+            ]
+        )
+
+
+class U3(Operation):
+    num_params = 3
+
+    def _matrix(self, theta, phi, delta):
+        c, s = np.cos(theta / 2), np.sin(theta / 2)
+        return np.array(
+            [[c, -np.exp(1j * delta) * s], [np.exp(1j * phi) * s, np.exp(1j * (phi + delta)) * c]]
+        )
+
+
+class CNOT(Operation):
+    num_wires = 2
+
+    def _matrix(self):
+        return _controlled(PauliX._matrix(None))
+
+
+class CZ(Operation):
+    num_wires = 2
+
+    def _matrix(self):
+        return np.diag([1, 1, 1, -1]).astype(complex)
+
+
+class SWAP(Operation):
+    num_wires = 2
+
+    def _matrix(self):
+        return np.eye(4, dtype=complex)[[0, 2, 1, 3]]
+
+
+class Toffoli(Operation):
+    num_wires = 3
+
+    def _matrix(self):
+        return _controlled(CNOT._matrix(None))
+
+
+class CRY(Operation):
+    num_params = 1
+    num_wires = 2
+
+    def _matrix(self, theta):
+        return _controlled(RY._matrix(None, theta))
+
+
+@lru_cache(maxsize=64)
+def excitation_matrix(n_wires, phi):
+    """Dense matrix of `Excitation` on `n_wires` wires, cached and read-only.
+
+    Args:
+        - n_wires (int): even number of wires 2k
+        - phi (float): rotation angle
+
+    Returns:
+        - (np.ndarray): 2^(2k) x 2^(2k) matrix rotating |0..01..1> into |1..10..0>
+    """
+
+    k = n_wires // 2
+    lo, hi = 2 ** k - 1, (2 ** k - 1) << k
+    c, s = np.cos(phi / 2), np.sin(phi / 2)
+    m = np.eye(2 ** n_wires, dtype=complex)
+    m[lo, lo], m[lo, hi], m[hi, lo], m[hi, hi] = c, -s, s, c
+    m.setflags(write=False)
+    return m
+
+
+class Excitation(Operation):
+    """k-fold excitation: Givens rotation of |0..01..1> and |1..10..0> on 2k wires by the angle phi.
+
+    Only these two amplitudes change, so the rotation is applied by updating them in place instead
+    of multiplying by its 2^(2k) x 2^(2k) matrix; `matrix` is built (and cached) only on request.
+    Like `SingleExcitation` and `DoubleExcitation`, which are its cases k = 1 and 2, its generator
+    has the eigenvalues -1/2, 0 and 1/2, so derivatives follow the four-term shift rule of
+    `grad_recipe`, see `shift_derivative`.
+    """
+
+    num_params = 1
+    num_wires = None
+
+    # (coefficient, shift) pairs of d/dphi f(phi) = sum c f(phi + shift)
+    _c1 = (np.sqrt(2) + 1) / (4 * np.sqrt(2))
+    _c2 = (np.sqrt(2) - 1) / (4 * np.sqrt(2))
+    grad_recipe = ((_c1, np.pi / 2), (-_c1, -np.pi / 2), (-_c2, 3 * np.pi / 2), (_c2, -3 * np.pi / 2))
+
+    def __init__(self, phi, wires):
+        super().__init__(phi, wires=wires)
+        if len(self.wires) % 2:
+            raise ValueError(f"{type(self).__name__} acts on an even number of wires, got {len(self.wires)}")
+
+    def _matrix(self, phi):
+        return excitation_matrix(len(self.wires), float(phi))
+
+    def apply_to(self, state, axes):
+        phi = -self.parameters[0] if self.inverse else self.parameters[0]
+        c, s = np.cos(phi / 2), np.sin(phi / 2)
+        k = len(axes) // 2
+        lo, hi = [slice(None)] * state.ndim, [slice(None)] * state.ndim
+        for i, axis in enumerate(axes):
+            lo[axis], hi[axis] = int(i >= k), int(i < k)
+        lo, hi = tuple(lo), tuple(hi)
+        a, b = state[lo].copy(), state[hi].copy()
+        state[lo] = c * a - s * b
+        state[hi] = s * a + c * b
+        return state
+
+    @classmethod
+    def shift_derivative(cls, f, phi):
+        """Exact derivative of an expectation value f(phi) of the rotation angle, from `grad_recipe`."""
+
+        return sum(coefficient * f(phi + shift) for coefficient, shift in cls.grad_recipe)
+
+
+class SingleExcitation(Excitation):
+    """Givens rotation of |01> and |10> by the angle phi."""
+
+    num_wires = 2
+
+
+class DoubleExcitation(Excitation):
+    """Givens rotation of |0011> and |1100> by the angle phi."""
+
+    num_wires = 4
+
+
+class QubitUnitary(Operation):
+    num_params = 1
+    num_wires = None
+
+    def __init__(self, U, wires):
+        super().__init__(U, wires=wires)
+        if np.shape(U) != (2 ** len(self.wires),) * 2:
+            raise ValueError(f"QubitUnitary: matrix of shape {np.shape(U)} does not fit {len(self.wires)} wires")
+
+    def _matrix(self, U):
+        return np.asarray(U, dtype=complex)
+
+
+class ControlledQubitUnitary(Operation):
+    num_params = 1
+    num_wires = None
+
+    def __init__(self, U, control_wires, wires):
+        self.control_wires = _to_wires(control_wires)
+        super().__init__(U, wires=self.control_wires + _to_wires(wires))
+
+    def _matrix(self, U):
+        m = np.asarray(U, dtype=complex)
+        for _ in self.control_wires:
+            m = _controlled(m)
+        return m
+
+
+class MultiplexedRY(Operation):
+    """Uniformly controlled RY: RY(thetas[j]) on the target when the controls are in state j.
+
+    The first control wire is the most significant bit of j. The operation is applied to the state
+    directly, in O(2^n) time, without building its 2^(k+1) x 2^(k+1) matrix; `qhack.bits.gray_code_ry` gives
+    its decomposition into RY and CNOT gates.
+    """
+
+    num_params = 1
+    num_wires = None
+
+    def __init__(self, thetas, control_wires, wires):
+        self.control_wires = _to_wires(control_wires)
+        super().__init__(thetas, wires=self.control_wires + _to_wires(wires))
+        if np.shape(thetas) != (2 ** len(self.control_wires),):
+            expected = 2 ** len(self.control_wires)
+            raise ValueError(f"MultiplexedRY: {len(self.control_wires)} controls need {expected} angles")
+
+    def _matrix(self, thetas):
+        return _block_diag([RY._matrix(None, theta) for theta in thetas])
+
+    def apply_to(self, state, axes):
+        thetas = np.asarray(self.parameters[0], dtype=float)
+        thetas = -thetas if self.inverse else thetas
+        c, s = np.cos(thetas / 2)[:, None], np.sin(thetas / 2)[:, None]
+        k = len(axes)
+        psi = np.moveaxis(state, axes, range(k)).reshape(2 ** (k - 1), 2, -1)
+        a0, a1 = psi[:, 0], psi[:, 1]
+        psi = np.stack([c * a0 - s * a1, s * a0 + c * a1], axis=1)
+        return np.moveaxis(psi.reshape(state.shape), range(k), axes)
+
+
+def _block_diag(blocks):
+    n = sum(b.shape[0] for b in blocks)
+    m = np.zeros((n, n), dtype=complex)
+    start = 0
+    for b in blocks:
+        m[start : start + b.shape[0], start : start + b.shape[0]] = b
+        start += b.shape[0]
+    return m
+
+
+class Hermitian(Operation):
+    """Observable given by a Hermitian matrix."""
+
+    num_params = 1
+    num_wires = None
+
+    def _matrix(self, A):
+        return np.asarray(A, dtype=complex)
+
+
+class QFT(Operation):
+    num_wires = None
+
+    def __init__(self, wires):
+        super().__init__(wires=wires)
+
+    def _matrix(self):
+        n = 2 ** len(self.wires)
+        k = np.arange(n)
+        return np.exp(2j * np.pi * np.outer(k, k) / n) / np.sqrt(n)
+
+
+class BasisState(Operation):
+    """Prepares a computational basis state; must be the first operation of a circuit."""
+
+    num_params = 1
+    num_wires = None
+
+    def _matrix(self, basis_state):
+        raise ValueError("BasisState is a state preparation and has no matrix")
+
+
+def QuantumPhaseEstimation(unitary, target_wires, estimation_wires):
+    """Queues the phase estimation circuit of `unitary` (same decomposition as PennyLane's template).
+
+    Args:
+        - unitary (np.ndarray): matrix acting on `target_wires`
+        - target_wires (list): wires the unitary acts on
+        - estimation_wires (list): wires that receive the phase, most significant first
+    """
+
+    estimation_wires = _to_wires(estimation_wires)
+    powers = [np.asarray(unitary, dtype=complex)]
+    for _ in estimation_wires[1:]:
+        powers.append(powers[-1] @ powers[-1])
+
+    for wire in estimation_wires:
+        Hadamard(wires=wire)
+    for wire, power in zip(estimation_wires, reversed(powers)):
+        ControlledQubitUnitary(power, control_wires=wire, wires=target_wires)
+    QFT(wires=estimation_wires).inv()
+
+
+# ---------------------------------------------------------------------------------------------
+# measurements
+# ---------------------------------------------------------------------------------------------
+
+
+class MeasurementProcess:
+    """Measurement returned by a quantum function."""
+
+    def __init__(self, return_type, obs=None, wires=None):
+        self.return_type = return_type
+        self.obs = obs
+        self.wires = obs.wires if obs is not None else (None if wires is None else _to_wires(wires))
+
+    def __repr__(self):
+        target = repr(self.obs) if self.obs is not None else f"wires={self.wires}"
+        return f"{self.return_type}({target})"
+
+
+def expval(op):
+    _dequeue(op)
+    return MeasurementProcess("expval", obs=op)
+
+
+def sample(op=None, wires=None):
+    if op is not None:
+        _dequeue(op)
+    return MeasurementProcess("sample", obs=op, wires=wires)
+
+
+def probs(wires=None, op=None):
+    if op is not None:
+        _dequeue(op)
+    return MeasurementProcess("probs", obs=op, wires=wires)
+
+
+def state():
+    return MeasurementProcess("state")
+
+
+def density_matrix(wires):
+    return MeasurementProcess("density_matrix", wires=wires)
+
+
+# ---------------------------------------------------------------------------------------------
+# tapes, devices and QNodes
+# ---------------------------------------------------------------------------------------------
+
+
+class QuantumTape:
+    """Records the operations queued inside a `with` block.
+
+    Attributes:
+        - operations (list(Operation)): recorded gates, in order
+        - measurements (list(MeasurementProcess)): measurements of the circuit, set by `QNode`
+    """
+
+    def __init__(self):
+        self.operations = []
+        self.measurements = []
+
+    def __enter__(self):
+        _recording.append(self.operations)
+        return self
+
+    def __exit__(self, *exc):
+        _recording.pop()
+        return False
+
+
+class Device:
+    """Statevector device.
+
+    Args:
+        - wires (int or list): number of wires or wire labels
+        - shots (int): number of samples for `sample` (and estimated `probs`/`expval`), None for exact results
+        - seed (int): seed of the random number generator used for sampling
+    """
+
+    def __init__(self, wires, shots=None, seed=None, name="default.qubit"):
+        self.short_name = name
+        self.wires = list(range(wires)) if isinstance(wires, int) else _to_wires(wires)
+        self.num_wires = len(self.wires)
+        self.wire_map = {w: i for i, w in enumerate(self.wires)}
+        self.shots = shots
+        self.rng = np.random.default_rng(seed)
+        self._state = None
+        self._samples = None
+
+    def axes(self, wires):
+        try:
+            return [self.wire_map[w] for w in wires]
+        except KeyError as e:
+            raise ValueError(f"wire {e.args[0]!r} is not on the device (wires {self.wires})") from None
+
+    def apply(self, operations):
+        """Evolves |0...0> through `operations` and stores the final state."""
+
+        n = self.num_wires
+        state = np.zeros((2,) * n, dtype=complex)
+        state[(0,) * n] = 1
+        for i, op in enumerate(operations):
+            axes = self.axes(op.wires)
+            if isinstance(op, BasisState):
+                if i != 0:
+                    raise ValueError("BasisState must be the first operation of the circuit")
+                state[(0,) * n] = 0
+                index = [0] * n
+                for axis, bit in zip(axes, np.asarray(op.parameters[0]).reshape(-1)):
+                    index[axis] = int(bit)
+                state[tuple(index)] = 1
+                continue
+            state = op.apply_to(state, axes)
+        self._state = state
+        self._samples = None
+
+    def basis_samples(self):
+        """Samples `shots` computational basis states, as an array of bits of shape (shots, wires)."""
+
+        if self._samples is None:
+            p = np.abs(self._state.reshape(-1)) ** 2
+            indices = self.rng.choice(p.size, size=self.shots, p=p / p.sum())
+            self._samples = index_to_bits(indices, self.num_wires).astype(int)
+        return self._samples
+
+    def _observable_amplitudes(self, obs):
+        """Eigenvalues of `obs` and the probability of each of them."""
+
+        eigvals, eigvecs = np.linalg.eigh(obs.matrix)
+        k = len(obs.wires)
+        psi = np.moveaxis(self._state, self.axes(obs.wires), range(k)).reshape(2 ** k, -1)
+        p = np.sum(np.abs(eigvecs.conj().T @ psi) ** 2, axis=1)
+        return eigvals, p / p.sum()
+
+    def measure(self, m):
+        """Evaluates one measurement on the stored state."""
+
+        wires = self.wires if m.wires is None else m.wires
+        axes = self.axes(wires)
+        k = len(axes)
+
+        if m.return_type == "state":
+            return self._state.reshape(-1)
+
+        if m.return_type == "density_matrix":
+            # like PennyLane, the reduced density matrix keeps the device order of its wires
+            psi = np.moveaxis(self._state, sorted(axes), range(k)).reshape(2 ** k, -1)
+            return psi @ psi.conj().T
+
+        if m.return_type == "sample":
+            if self.shots is None:
+                raise ValueError("sample requires a device with shots")
+            if m.obs is None:
+                return np.squeeze(self.basis_samples()[:, axes])
+            eigvals, p = self._observable_amplitudes(m.obs)
+            return np.squeeze(self.rng.choice(np.round(eigvals, 12), size=self.shots, p=p))
+
+        if m.return_type == "expval":
+            if self.shots is not None:
+                return np.mean(self.measure(MeasurementProcess("sample", obs=m.obs)))
+            phi = apply_matrix(self._state, m.obs.matrix, axes)
+            return np.real(np.vdot(self._state, phi))
+
+        if m.return_type == "probs":
+            if m.obs is not None:
+                return self._observable_amplitudes(m.obs)[1]
+            if self.shots is not None:
+                weights = 2 ** np.arange(k - 1, -1, -1)
+                counts = np.bincount(self.basis_samples()[:, axes] @ weights, minlength=2 ** k)
+                return counts / self.shots
+            p = np.abs(self._state) ** 2
+            others = tuple(a for a in range(self.num_wires) if a not in axes)
+            p = np.sum(p, axis=others)
+            # the remaining axes are in device order; bring them into the requested order
+            order = np.argsort(np.argsort(axes))
+            return np.transpose(p, order).reshape(-1)
+
+        raise ValueError(f"unsupported measurement {m.return_type}")
+
+    def execute(self, operations, measurements):
+        self.apply(operations)
+        return [self.measure(m) for m in measurements]
+
+
+def device(name, wires, shots=None, seed=None):
+    """Creates a device.
+
+    The name "default.clifford", or any name when the environment variable `QHACK_BACKEND` is
+    "stabilizer", gives a `qhack.stabilizer.StabilizerDevice`; other names are kept for reference
+    only and give a statevector `Device`.
+    """
+
+    if name == "default.clifford" or os.environ.get("QHACK_BACKEND") == "stabilizer":
+        from qhack.stabilizer import StabilizerDevice
+
+        return StabilizerDevice(wires, shots=shots, seed=seed, name=name)
+    return Device(wires, shots=shots, seed=seed, name=name)
+
+
+def apply_matrix(state, matrix, axes):
+    """Applies a 2^k x 2^k matrix to the axes `axes` of a state of shape (2,) * n."""
+
+    k = len(axes)
+    m = np.reshape(matrix, (2,) * (2 * k))
+    state = np.tensordot(m, state, axes=(list(range(k, 2 * k)), axes))
+    return np.moveaxis(state, list(range(k)), axes)
+
+
+class QNode:
+    """Quantum function bound to a `Device`; calling it records the circuit and executes it.
+
+    The tape of the last call is kept in `tape`. With `optimize=True` (by default when the
+    environment variable `QHACK_OPTIMIZE` is "1") the tape is simplified with
+    `qhack.transforms.optimize` before execution and the report is kept in `optimization`.
+    """
+
+    def __init__(self, func, device, optimize=None, **kwargs):
+        if kwargs.get("diff_method") not in (None, "best"):
+            raise ValueError("qhack.statevector does not compute gradients")
+        self.func = func
+        self.device = device
+        self.optimize = os.environ.get("QHACK_OPTIMIZE") == "1" if optimize is None else optimize
+        self.tape = None
+        self.optimization = None
+
+    def __call__(self, *args, **kwargs):
+        with QuantumTape() as tape:
+            result = self.func(*args, **kwargs)
+
+        multiple = isinstance(result, (list, tuple))
+        tape.measurements = list(result) if multiple else [result]
+        if self.optimize:
+            from qhack import transforms
+
+            fuse = getattr(self.device, "fuse_single_qubit", True)
+            tape.operations, self.optimization = transforms.optimize(tape.operations, fuse=fuse)
+        self.tape = tape
+        results = self.device.execute(tape.operations, tape.measurements)
+
+        if not multiple:
+            return _as_tensor(results[0])
+        if len({np.shape(r) for r in results}) == 1:
+            return _as_tensor(np.array(results))
+        return tuple(_as_tensor(r) for r in results)
+
+
+def qnode(device, **kwargs):
+    """Decorator turning a quantum function into a `QNode` on `device`."""
+
+    def decorator(func):
+        return QNode(func, device, **kwargs)
+
+    return decorator
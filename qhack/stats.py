@@ -0,0 +1,55 @@
+"""Confidence intervals for binomial proportions estimated by sampling.
+
+Used by the sampling challenges (e.g. Elitzur–Vaidman) to decide when a Monte Carlo estimate is
+precise enough to stop drawing more trials.
+"""
+
+import math
+from statistics import NormalDist
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """Wilson score interval of a binomial proportion.
+
+    Args:
+        - successes (int): number of successful trials
+        - trials (int): number of trials
+        - confidence (float): confidence level, e.g. 0.95
+
+    Returns:
+        - (float, float): lower and upper bound; (0, 1) when there are no trials
+    """
+
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def clopper_pearson_interval(successes, trials, confidence=0.95):
+    """Exact (Clopper–Pearson) interval of a binomial proportion. Requires SciPy.
+
+    Args:
+        - successes (int): number of successful trials
+        - trials (int): number of trials
+        - confidence (float): confidence level, e.g. 0.95
+
+    Returns:
+        - (float, float): lower and upper bound; (0, 1) when there are no trials
+    """
+
+    from scipy.stats import beta
+
+    if trials == 0:
+        return 0.0, 1.0
+    alpha = 1 - confidence
+    low = 0.0 if successes == 0 else beta.ppf(alpha / 2, successes, trials - successes + 1)
+    high = 1.0 if successes == trials else beta.ppf(1 - alpha / 2, successes + 1, trials - successes)
+    return float(low), float(high)
+
+
+INTERVALS = {"wilson": wilson_interval, "clopper-pearson": clopper_pearson_interval}
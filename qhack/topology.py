@@ -0,0 +1,347 @@
+"""Coupling maps of quantum hardware with precomputed shortest paths.
+
+The adapting-topology challenge asks for the number of SWAPs needed before a CNOT can act on two
+qubits of a hardware graph. `CouplingMap` runs a breadth-first search from every qubit once, when
+it is built, and stores the distances and next hops of all pairs in NumPy arrays, so every later
+query is a table lookup. All searches advance together, one BFS level at a time, so building the
+map for graphs with thousands of qubits takes seconds.
+
+`route` maps a whole circuit of one- and two-qubit gates onto a coupling map, inserting SWAPs with
+the lookahead heuristic of SABRE (Li, Ding and Xie, 2019).
+
+Usage:
+    python -m qhack.topology --rows 8 --cols 8 --gates 10000    # route a random CNOT circuit
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+RoutedCircuit = namedtuple("RoutedCircuit", ["operations", "swaps", "depth", "initial_layout", "final_layout"])
+
+
+def grid_graph(rows, cols):
+    """Adjacency dict of a rows x cols square lattice, with qubit r * cols + c at row r, column c.
+
+    Args:
+        - rows (int): number of rows
+        - cols (int): number of columns
+
+    Returns:
+        - (dict(int, list(int))): neighbours of every qubit
+    """
+
+    graph = {}
+    for r in range(rows):
+        for c in range(cols):
+            q = r * cols + c
+            steps = ((r - 1, c), (r, c - 1), (r, c + 1), (r + 1, c))
+            graph[q] = [r2 * cols + c2 for r2, c2 in steps if 0 <= r2 < rows and 0 <= c2 < cols]
+    return graph
+
+
+class CouplingMap:
+    """All-pairs shortest paths of a hardware graph.
+
+    Edges are treated as undirected. `distance[i, j]` is the number of edges between the qubits
+    with indices i and j (-1 if they are disconnected) and `next_hop[i, j]` the index of the
+    neighbour of i on a shortest path to j (-1 if i == j or they are disconnected). Indices follow
+    `nodes`, the sorted qubit labels.
+
+    Args:
+        - graph (dict): adjacency dict mapping every qubit label to a list of its neighbours
+    """
+
+    def __init__(self, graph):
+        self.nodes = sorted(set(graph) | {v for neighbours in graph.values() for v in neighbours})
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        n = len(self.nodes)
+        dtype = np.int16 if n < 2 ** 15 else np.int32
+
+        neighbours = [set() for _ in range(n)]
+        for u, vs in graph.items():
+            for v in vs:
+                if u != v:
+                    neighbours[self.index[u]].add(self.index[v])
+                    neighbours[self.index[v]].add(self.index[u])
+        degree = max((len(vs) for vs in neighbours), default=0)
+        # padded neighbour table: row i lists the neighbours of i followed by -1
+        table = np.full((n, max(degree, 1)), -1, dtype=np.int64)
+        for i, vs in enumerate(neighbours):
+            table[i, : len(vs)] = sorted(vs)
+        self.neighbours = table
+
+        self.distance = np.full((n, n), -1, dtype=dtype)
+        self.next_hop = np.full((n, n), -1, dtype=dtype)
+        self._search(dtype)
+
+    def _search(self, dtype):
+        """Breadth-first search from every qubit at once, over (source, qubit) pairs."""
+
+        n = len(self.nodes)
+        sources = np.arange(n)
+        frontier = np.arange(n)
+        self.distance[sources, sources] = 0
+        level = 0
+        while sources.size:
+            level += 1
+            candidates = self.neighbours[frontier]
+            src = np.repeat(sources, candidates.shape[1])
+            parent = np.repeat(frontier, candidates.shape[1])
+            candidates = candidates.ravel()
+            keep = candidates >= 0
+            src, parent, candidates = src[keep], parent[keep], candidates[keep]
+            keep = self.distance[src, candidates] < 0
+            src, parent, candidates = src[keep], parent[keep], candidates[keep]
+            # a qubit reached from several frontier qubits keeps the first of them as its parent
+            _, first = np.unique(src * n + candidates, return_index=True)
+            sources, frontier, parent = src[first], candidates[first], parent[first]
+            self.distance[sources, frontier] = level
+            # the parent of q in the tree grown from s is the next hop from q towards s
+            self.next_hop[frontier, sources] = parent.astype(dtype)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def dist(self, a, b):
+        """Number of edges on a shortest path between qubits `a` and `b`.
+
+        Raises:
+            - ValueError: if the qubits are not connected
+        """
+
+        d = int(self.distance[self.index[a], self.index[b]])
+        if d < 0:
+            raise ValueError(f"qubits {a} and {b} are not connected")
+        return d
+
+    def path(self, a, b):
+        """Qubit labels of a shortest path from `a` to `b`, both included."""
+
+        self.dist(a, b)
+        i, j = self.index[a], self.index[b]
+        path = [a]
+        while i != j:
+            i = int(self.next_hop[i, j])
+            path.append(self.nodes[i])
+        return path
+
+    def n_swaps(self, a, b):
+        """Minimum number of SWAPs to apply a CNOT between `a` and `b` and restore the layout.
+
+        The control is swapped along the shortest path until it is next to the target, and swapped
+        back afterwards.
+        """
+
+        return 2 * max(self.dist(a, b) - 1, 0)
+
+
+def _as_gates(operations):
+    """(name, wires) pairs of a tape, a list of operations or a list of (name, wires) pairs."""
+
+    gates = []
+    for op in getattr(operations, "operations", operations):
+        name, wires = (op.name, op.wires) if hasattr(op, "wires") else op
+        wires = tuple(wires)
+        if len(wires) not in (1, 2):
+            raise ValueError(f"{name} acts on {len(wires)} wires; only one- and two-qubit gates can be routed")
+        gates.append((name, wires))
+    return gates
+
+
+def route(operations, coupling_map, initial_layout=None, lookahead=20, weight=0.5, decay=0.001):
+    """Inserts SWAPs so that every two-qubit gate acts on neighbouring physical qubits.
+
+    Gates whose qubits are neighbours under the current layout are applied as soon as all the gates
+    before them on the same wires are. When none is, the SWAP on an edge touching a blocked gate
+    that minimises the mean distance of the blocked gates, plus `weight` times the mean distance of
+    the next `lookahead` two-qubit gates, is applied and the logical-to-physical layout updated.
+    The score of a SWAP grows by `decay` each time one of its qubits was just swapped, which spreads
+    SWAPs over qubits and lowers the depth. If no gate becomes executable after as many SWAPs as
+    there are physical qubits, the qubits of the closest blocked gate are brought together along a
+    shortest path.
+
+    Args:
+        - operations: tape, list of operations (with `name` and `wires`) or of (name, wires) pairs
+          acting on logical qubits
+        - coupling_map (CouplingMap): hardware graph
+        - initial_layout (dict): logical qubit -> physical qubit; by default the sorted logical
+          qubits are placed on the first physical qubits of `coupling_map.nodes`
+        - lookahead (int): number of upcoming two-qubit gates taken into account, 0 to only look at
+          the blocked gates
+        - weight (float): weight of the upcoming gates relative to the blocked ones
+        - decay (float): penalty added to recently swapped qubits
+
+    Returns:
+        - (RoutedCircuit): the routed (name, physical wires) pairs, including ("SWAP", (p, q)), the
+        number of SWAPs, the depth of the routed circuit, and the initial and final layouts
+    """
+
+    gates = _as_gates(operations)
+    logical = sorted({w for _, wires in gates for w in wires} | set(initial_layout or ()))
+    if len(logical) > len(coupling_map):
+        raise ValueError(f"{len(logical)} logical qubits do not fit on {len(coupling_map)} physical qubits")
+    if initial_layout is None:
+        initial_layout = dict(zip(logical, coupling_map.nodes))
+    l_index = {q: i for i, q in enumerate(logical)}
+    n = len(coupling_map)
+
+    l2p = np.array([coupling_map.index[initial_layout[q]] for q in logical], dtype=np.int64)
+    p2l = np.full(n, -1, dtype=np.int64)
+    p2l[l2p] = np.arange(len(logical))
+    if len(set(l2p.tolist())) != len(logical):
+        raise ValueError("initial_layout maps two logical qubits onto the same physical qubit")
+
+    # dependency graph: each gate waits for the previous gate on each of its wires
+    qubits = [tuple(l_index[w] for w in wires) for _, wires in gates]
+    successors = [[] for _ in gates]
+    waiting = [0] * len(gates)
+    last = {}
+    for g, wires in enumerate(qubits):
+        for q in wires:
+            if q in last and g not in successors[last[q]]:
+                successors[last[q]].append(g)
+                waiting[g] += 1
+            last[q] = g
+
+    distance = coupling_map.distance
+    routed, swaps = [], 0
+    level = np.zeros(n, dtype=np.int64)
+    penalty = np.ones(n)
+    front = [g for g in range(len(gates)) if waiting[g] == 0]
+    since_progress = 0
+    front_pairs = None
+
+    def emit(name, physical):
+        level[list(physical)] = level[list(physical)].max() + 1
+        routed.append((name, tuple(coupling_map.nodes[p] for p in physical)))
+
+    while front:
+        progress = False
+        blocked = []
+        queue = deque(front)
+        while queue:
+            g = queue.popleft()
+            physical = tuple(int(l2p[q]) for q in qubits[g])
+            if len(physical) == 2 and distance[physical] != 1:
+                if distance[physical] < 0:
+                    raise ValueError(f"gate {g} acts on disconnected qubits")
+                blocked.append(g)
+                continue
+            emit(gates[g][0], physical)
+            progress = True
+            for h in successors[g]:
+                waiting[h] -= 1
+                if waiting[h] == 0:
+                    queue.append(h)
+        front = blocked
+        if not front:
+            break
+
+        if progress or front_pairs is None:
+            since_progress = 0
+            penalty[:] = 1
+            # the blocked gates and the gates after them only change when a gate is applied
+            front_pairs = np.array([qubits[g] for g in front])
+            extended = []
+            seen = set(front)
+            queue = deque(h for g in front for h in successors[g])
+            while queue and len(extended) < lookahead:
+                h = queue.popleft()
+                if h in seen:
+                    continue
+                seen.add(h)
+                if len(qubits[h]) == 2:
+                    extended.append(qubits[h])
+                queue.extend(successors[h])
+            extended_pairs = np.array(extended, dtype=np.int64).reshape(-1, 2)
+
+        if since_progress >= n:
+            # release valve: move the first qubit of the closest blocked gate next to the second
+            a, b = min(front_pairs.tolist(), key=lambda pair: distance[l2p[pair[0]], l2p[pair[1]]])
+            pa, pb = int(l2p[a]), int(l2p[b])
+            path = []
+            while distance[pa, pb] > 1:
+                hop = int(coupling_map.next_hop[pa, pb])
+                path.append((pa, hop))
+                pa = hop
+            candidates = path
+        else:
+            physical = np.unique(l2p[front_pairs])
+            neighbours = coupling_map.neighbours[physical]
+            p, q = np.repeat(physical, neighbours.shape[1]), neighbours.ravel()
+            keep = q >= 0
+            # every edge once, encoded as min * n + max
+            edges = np.unique(np.minimum(p[keep], q[keep]) * n + np.maximum(p[keep], q[keep]))
+            pairs = np.stack([edges // n, edges % n], axis=1)
+            p, q = pairs[:, :1], pairs[:, 1:]
+
+            def cost(logical_pairs):
+                a, b = l2p[logical_pairs[:, 0]], l2p[logical_pairs[:, 1]]
+                a = np.where(a == p, q, np.where(a == q, p, a))
+                b = np.where(b == p, q, np.where(b == q, p, b))
+                return distance[a, b].mean(axis=1)
+
+            score = cost(front_pairs)
+            if len(extended_pairs):
+                score = score + weight * cost(extended_pairs)
+            score = score * np.maximum(penalty[pairs[:, 0]], penalty[pairs[:, 1]])
+            candidates = [tuple(int(x) for x in pairs[int(np.argmin(score))])]
+
+        for p, q in candidates:
+            emit("SWAP", (p, q))
+            swaps += 1
+            since_progress += 1
+            lp, lq = p2l[p], p2l[q]
+            p2l[p], p2l[q] = lq, lp
+            if lp >= 0:
+                l2p[lp] = q
+            if lq >= 0:
+                l2p[lq] = p
+            penalty[p] += decay
+            penalty[q] += decay
+        if swaps % 5 == 0:
+            penalty[:] = 1
+
+    final_layout = {q: coupling_map.nodes[int(l2p[i])] for i, q in enumerate(logical)}
+    return RoutedCircuit(routed, swaps, int(level.max(initial=0)), dict(initial_layout), final_layout)
+
+
+def random_cnots(n_qubits, n_gates, seed=0):
+    """Random circuit of `n_gates` CNOTs between `n_qubits` logical qubits, as (name, wires) pairs."""
+
+    rng = random.Random(seed)
+    return [("CNOT", tuple(rng.sample(range(n_qubits), 2))) for _ in range(n_gates)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=8, help="rows of the square-lattice hardware graph")
+    parser.add_argument("--cols", type=int, default=8, help="columns of the square-lattice hardware graph")
+    parser.add_argument("--gates", type=int, default=10000, help="number of random CNOTs")
+    parser.add_argument("--lookahead", type=int, default=20, help="upcoming gates scored for each SWAP")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random circuit")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    coupling_map = CouplingMap(grid_graph(args.rows, args.cols))
+    print(f"{len(coupling_map)} qubits: shortest paths in {time.perf_counter() - start:.2f}s")
+
+    circuit = random_cnots(len(coupling_map), args.gates, args.seed)
+    for lookahead in sorted({0, args.lookahead}):
+        start = time.perf_counter()
+        result = route(circuit, coupling_map, lookahead=lookahead)
+        seconds = time.perf_counter() - start
+        print(
+            f"lookahead {lookahead:3d}: {args.gates} gates, {result.swaps} SWAPs, depth {result.depth} "
+            f"in {seconds:.2f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
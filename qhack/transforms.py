@@ -0,0 +1,193 @@
+"""Peephole optimization of recorded `qhack.statevector` tapes.
+
+Several solutions queue gates that undo each other: the qRAM circuit conjugates every block with
+`PauliX` gates that cancel between consecutive addresses, and oracles are bracketed by
+`PauliX`/`Hadamard` pairs. `optimize` removes such redundancy before a circuit is executed:
+
+- a gate directly followed (on all of its wires) by its inverse is removed together with it, which
+  covers self-inverse gates (Hadamard, Pauli, CNOT, CZ, SWAP, Toffoli) and pairs such as
+  `QFT` / `QFT.inv`;
+- consecutive rotations of the same kind on the same wires are merged by adding their angles, and
+  dropped when the sum is a multiple of their period;
+- with `fuse=True`, every remaining run of two or more single-qubit gates on a wire is replaced by
+  one `QubitUnitary` (or dropped if the product is the identity).
+
+Setting the environment variable `QHACK_OPTIMIZE=1` makes every `qhack.statevector` QNode run the
+pass on its tape before execution; the report of the last call is kept in `QNode.optimization`.
+
+The pass only understands `qhack.statevector` operations, so it applies to the circuits of the
+NumPy and stabilizer backends (`QHACK_BACKEND`). PennyLane QNodes, including every template that
+runs on `default.qubit`, are executed unchanged; PennyLane's own `qml.compile` covers those.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from qhack import statevector
+
+# gates equal to their own inverse, and those among them whose wires can be exchanged
+SELF_INVERSE = {"Identity", "Hadamard", "PauliX", "PauliY", "PauliZ", "CNOT", "CZ", "SWAP", "Toffoli"}
+SYMMETRIC = {"CZ", "SWAP"}
+
+# one-parameter gates with U(a) U(b) = U(a + b), and the period after which U(a) is the identity
+ROTATIONS = {
+    "RX": 4 * np.pi,
+    "RY": 4 * np.pi,
+    "RZ": 4 * np.pi,
+    "PhaseShift": 2 * np.pi,
+    "CRY": 4 * np.pi,
+    "SingleExcitation": 4 * np.pi,
+    "DoubleExcitation": 4 * np.pi,
+    "Excitation": 4 * np.pi,
+}
+
+
+class OptimizationReport(namedtuple("OptimizationReport", ["before", "after", "cancelled", "merged", "fused"])):
+    """Gate counts before and after `optimize`, and the number of gates removed by each rule."""
+
+    __slots__ = ()
+
+    @property
+    def reduction(self):
+        """(float): fraction of the gates that were removed"""
+
+        return 1 - self.after / self.before if self.before else 0.0
+
+
+def _detached(cls, *params, wires):
+    """Creates an operation without queuing it on a tape that may be recording."""
+
+    op = cls(*params, wires=wires)
+    statevector._dequeue(op)
+    return op
+
+
+def _base_name(op):
+    return type(op).__name__
+
+
+def _same_wires(a, b):
+    if _base_name(a) in SYMMETRIC:
+        return set(a.wires) == set(b.wires)
+    if _base_name(a) == "Toffoli":
+        return set(a.wires[:2]) == set(b.wires[:2]) and a.wires[2] == b.wires[2]
+    return list(a.wires) == list(b.wires)
+
+
+def _same_params(a, b):
+    return len(a.parameters) == len(b.parameters) and all(
+        np.shape(p) == np.shape(q) and np.allclose(p, q) for p, q in zip(a.parameters, b.parameters)
+    )
+
+
+def _cancels(a, b):
+    """Whether `b` undoes `a`."""
+
+    if type(a) is not type(b) or not _same_wires(a, b):
+        return False
+    if _base_name(a) in SELF_INVERSE:
+        return True
+    return a.inverse != b.inverse and _same_params(a, b)
+
+
+def _angle(op):
+    return -op.parameters[0] if op.inverse else op.parameters[0]
+
+
+def _is_identity_angle(angle, period):
+    angle = np.mod(angle, period)
+    return np.isclose(angle, 0) or np.isclose(angle, period)
+
+
+def optimize(operations, fuse=True):
+    """Cancels inverse pairs, merges rotations and optionally fuses single-qubit runs.
+
+    Args:
+        - operations: tape or list of `qhack.statevector` operations
+        - fuse (bool): fuse runs of single-qubit gates into `QubitUnitary` gates
+
+    Returns:
+        - (list(Operation), OptimizationReport): the optimized operations and gate counts
+    """
+
+    operations = list(getattr(operations, "operations", operations))
+    cancelled = merged = 0
+
+    # out[i] is None once the gate has been removed; stacks[w] holds the indices of the gates
+    # still in `out` that act on wire w, so the gate directly before a new one on all of its wires
+    # is found in O(1)
+    out, stacks = [], {}
+    for op in operations:
+        tops = {stacks[w][-1] if stacks.get(w) else None for w in op.wires}
+        previous = out[tops.pop()] if len(tops) == 1 and None not in tops else None
+        if previous is not None and set(previous.wires) != set(op.wires):
+            previous = None
+
+        if previous is not None and _cancels(previous, op):
+            out[stacks[op.wires[0]][-1]] = None
+            for w in op.wires:
+                stacks[w].pop()
+            cancelled += 2
+            continue
+
+        if (
+            previous is not None
+            and type(previous) is type(op)
+            and _base_name(op) in ROTATIONS
+            and list(previous.wires) == list(op.wires)
+        ):
+            index = stacks[op.wires[0]][-1]
+            angle = _angle(previous) + _angle(op)
+            if _is_identity_angle(angle, ROTATIONS[_base_name(op)]):
+                out[index] = None
+                for w in op.wires:
+                    stacks[w].pop()
+                merged += 2
+            else:
+                out[index] = _detached(type(op), angle, wires=op.wires)
+                merged += 1
+            continue
+
+        for w in op.wires:
+            stacks.setdefault(w, []).append(len(out))
+        out.append(op)
+
+    result = [op for op in out if op is not None]
+    fused = 0
+    if fuse:
+        result, fused = _fuse_single_qubit_runs(result)
+
+    report = OptimizationReport(len(operations), len(result), cancelled, merged, fused)
+    return result, report
+
+
+def _fuse_single_qubit_runs(operations):
+    """Replaces runs of single-qubit gates on the same wire by one `QubitUnitary`."""
+
+    result, runs, fused = [], {}, 0
+
+    def flush(wire):
+        nonlocal fused
+        run = runs.pop(wire, [])
+        if len(run) < 2:
+            result.extend(run)
+            return
+        matrix = np.eye(2, dtype=complex)
+        for op in run:
+            matrix = op.matrix @ matrix
+        fused += len(run)
+        if not np.allclose(matrix, np.eye(2)):
+            result.append(_detached(statevector.QubitUnitary, matrix, wires=[wire]))
+            fused -= 1
+
+    for op in operations:
+        if len(op.wires) == 1 and not isinstance(op, statevector.BasisState):
+            runs.setdefault(op.wires[0], []).append(op)
+            continue
+        for w in op.wires:
+            flush(w)
+        result.append(op)
+    for w in list(runs):
+        flush(w)
+    return result, fused
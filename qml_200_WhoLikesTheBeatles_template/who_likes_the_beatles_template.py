@@ -4,6 +4,14 @@ import sys
 from pennylane import numpy as np
 import pennylane as qml
 
+from qhack.devices import get_qnode
+
+
+def get_state(base_state):
+    """Embeds a feature vector in the amplitudes of one qubit and returns the state."""
+    qml.AmplitudeEmbedding(base_state, wires=0, normalize=True)
+    return qml.state()
+
 
 def distance(A, B):
     """Function that returns the distance between two vectors.
@@ -21,14 +29,9 @@ def distance(A, B):
     # The Swap test is a method that allows you to calculate |<A|B>|^2 , you could use it to help you.
     # The qml.AmplitudeEmbedding operator could help you too.
 
-    dev = qml.device("default.qubit", wires=1)
-    @qml.qnode(dev)
-    def get_state(base_state):
-        qml.AmplitudeEmbedding(base_state, wires=0, normalize=True)
-        return qml.state()
-    
-    A = get_state(A)
-    B = get_state(B)
+    circuit = get_qnode(get_state, "default.qubit", wires=1)
+    A = circuit(A)
+    B = circuit(B)
     return np.sqrt(2*(1-np.inner(A,np.conj(B))).real)
 
     # QHACK #
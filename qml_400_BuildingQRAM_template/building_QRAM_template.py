@@ -1,8 +1,37 @@
 #! /usr/bin/python3
 
+import os
 import sys
-from pennylane import numpy as np
-import pennylane as qml
+
+from qhack.bits import gray_code_ry
+
+if os.environ.get("QHACK_BACKEND") == "numpy":
+    import numpy as np
+    from qhack import statevector as qml
+else:
+    from pennylane import numpy as np
+    import pennylane as qml
+
+
+def multiplexed_ry(thetas, control_wires, target):
+    """Applies RY(thetas[j]) to `target` when `control_wires` are in the basis state j.
+
+    The NumPy backend applies it as one `MultiplexedRY` operation; on PennyLane it is decomposed
+    into 2^k RY and CNOT gates with `gray_code_ry`.
+
+    Args:
+        - thetas (list(float)): 2^k angles, the first control wire being the most significant bit of j
+        - control_wires (list(int)): the k control wires
+        - target (int): wire of the rotations
+    """
+
+    if os.environ.get("QHACK_BACKEND") == "numpy":
+        qml.MultiplexedRY(np.asarray(thetas), control_wires=control_wires, wires=target)
+        return
+    for angle, control in gray_code_ry(thetas):
+        qml.RY(angle, wires=target)
+        if control is not None:
+            qml.CNOT(wires=[control_wires[control], target])
 
 
 def qRAM(thetas):
@@ -17,53 +46,20 @@ def qRAM(thetas):
 
     # QHACK #
 
-    # Use this space to create auxiliary functions if you need it.
-    def get_unitary(theta):
-        RY = [[0,0],[0,0]]
-        RY[0][0] = np.cos(theta/2)
-        RY[0][1] = -np.sin(theta/2)
-        RY[1][0] = np.sin(theta/2)
-        RY[1][1] = np.cos(theta/2)
-        RY = np.array(RY)
-        U = []
-        for i in range(16):
-            state = np.zeros(16)
-            if i<14:
-                state[i] = 1
-            elif i == 14:
-                state[14] = np.cos(theta/2)
-                state[15] = -np.sin(theta/2)
-            elif i == 15:
-                state[14] = np.sin(theta/2)
-                state[15] = np.cos(theta/2)
-            U.append(state)
-        U = np.array(U)
-        return U
-                
-                
+    n_address = int(np.log2(len(thetas)))
 
     # QHACK #
 
-    dev = qml.device("default.qubit", wires=range(4))
+    dev = qml.device("default.qubit", wires=range(n_address + 1))
 
     @qml.qnode(dev)
     def circuit():
 
         # QHACK #
-        qml.Hadamard(0)
-        qml.Hadamard(1)
-        qml.Hadamard(2)
-        arr = ['000','001','010','011','100','101','110','111']
-        # Create your circuit: the first three qubits will refer to the index, the fourth to the RY rotation.
-        for i,index in enumerate(arr):
-            for j in range(len(index)):
-                if index[j] == '0':
-                    qml.PauliX(j)
-            U = get_unitary(thetas[i])
-            qml.QubitUnitary(U, wires=[0, 1, 2, 3]) 
-            for j in range(len(index)):
-                if index[j] == '0':
-                    qml.PauliX(j)
+        for wire in range(n_address):
+            qml.Hadamard(wire)
+        # the first wires hold the index, the last one the RY rotation of that index
+        multiplexed_ry(thetas, list(range(n_address)), n_address)
         # QHACK #
 
         return qml.state()